@@ -0,0 +1,117 @@
+from client import create_completion
+from compaction import current_turn, prepare_messages
+from deadline import AGENT_TIMEOUT, deadline, partial_answer, step_time_limit, timeout_errors
+from executor import run_tool_calls
+from fused import FUSED_TOOL_CALLS, run_fused_tool_calls
+from hedging import hedger
+from prompt_cache import lookup, store
+from routing import MODEL, route
+from singleflight import COALESCE_AGENT_PROMPTS, agent_flight, prompt_key
+from streaming import collect_stream
+from tool_select import select_tools
+from tools import registry
+from tracing import annotate, span
+
+MAX_STEPS = 3  # prevent infinite loops
+
+
+def run_agent(user_prompt, client=None, max_steps=MAX_STEPS, on_message=None, on_token=None, timeout=None, history=None):
+    """Run the multi-step tool-calling loop for a prompt.
+
+    When `on_token` is given every completion is streamed and answer text is
+    passed to it as it arrives, so the final response can be rendered before
+    the completion finishes.
+
+    `timeout` is a time limit in seconds for the whole run (AGENT_TIMEOUT by
+    default, 0 for none). Every completion and tool call gets the time left as
+    its timeout, and tool calls still running at the deadline are abandoned.
+    Once it passes, the final answer is written from the tool results gathered
+    so far, in the last FINAL_ANSWER_RESERVE seconds (at most a quarter of the
+    limit).
+
+    Returns `(final_response, messages)`; `final_response` is None when the
+    model is still calling tools after `max_steps` completions.
+
+    With COALESCE_AGENT_PROMPTS, a prompt identical to one already running
+    waits for that run and shares its result. Only non-streaming runs on the
+    default client are shared, and only the run doing the work calls `on_message`.
+
+    `history` holds the messages of earlier turns, as dicts, when the prompt
+    follows up on a conversation. The returned messages then start with it.
+    Follow-ups bypass the prompt cache and are never coalesced.
+    """
+    timeout = (AGENT_TIMEOUT if timeout is None else timeout) or None
+    if history:
+        return _run_agent(user_prompt, client, max_steps, on_message, on_token, timeout, history)
+    cached = lookup(user_prompt, on_token)
+    if cached is not None:
+        return cached
+    if COALESCE_AGENT_PROMPTS and client is None and on_token is None:
+        (final_response, messages), shared = agent_flight.do(
+            (prompt_key(user_prompt), max_steps, timeout),
+            _run_agent, user_prompt, None, max_steps, on_message, None, timeout,
+        )
+        annotate(coalesced=shared)
+        return final_response, list(messages)
+    return _run_agent(user_prompt, client, max_steps, on_message, on_token, timeout)
+
+
+def agent_settings(messages):
+    """Routed settings for the next completion: phase plan until tool results arrive, then answer"""
+    phase = "answer" if any(isinstance(m, dict) and m.get("role") == "tool" for m in current_turn(messages)) else "plan"
+    return route("agent", phase, {"model": MODEL, "temperature": 0, "max_tokens": 300})
+
+
+def _complete_step(messages, client, on_token, tool_choice):
+    offered = select_tools(messages, registry)
+    # Streamed answers are already on screen, so only plain completions are hedged
+    response = hedger.call(
+        "agent" if on_token is None else None,
+        create_completion,
+        client,
+        messages=prepare_messages(messages, registry, offered),
+        tools=offered,
+        tool_choice=tool_choice,
+        stream=on_token is not None,
+        **agent_settings(messages),
+    )
+    if on_token is not None:
+        return collect_stream(response, on_token)
+    return response.choices[0].message
+
+
+def _final_answer(messages, client, on_token):
+    """Answer from the tool results gathered so far, or summarize them locally if even that times out"""
+    with span("agent.final"):
+        try:
+            return _complete_step(messages, client, on_token, "none").content
+        except timeout_errors():
+            return partial_answer(messages)
+
+
+def _run_agent(user_prompt, client, max_steps, on_message, on_token, timeout, history=None):
+    messages = [*(history or []), {"role": "user", "content": user_prompt}]
+
+    with deadline(timeout):
+        try:
+            with deadline(step_time_limit(timeout)):
+                for step in range(max_steps):
+                    with span("agent.step", step=step + 1):
+                        msg = _complete_step(messages, client, on_token, "auto")
+                        if on_message:
+                            on_message(msg)
+
+                        if not msg.tool_calls:
+                            if not history:
+                                store(user_prompt, msg.content, messages)
+                            return msg.content, messages
+                        messages.append(msg)  # Add the assistant's message containing tool_calls
+                        run = run_fused_tool_calls if FUSED_TOOL_CALLS else run_tool_calls
+                        messages.extend(run(msg.tool_calls, registry))
+        except timeout_errors():
+            if timeout is None:
+                raise
+            annotate(deadline_exceeded=True)
+            return _final_answer(messages, client, on_token), messages
+
+    return None, messages
@@ -1,66 +1,113 @@
-from groq import Groq
-import json
-import os
 import streamlit as st
-from tools import tools, get_current_weather, get_time, get_news, calculate_sum, get_joke, get_quote
 from dotenv import load_dotenv
 
-load_dotenv()
+load_dotenv()  # before the project modules read their settings
+
+from agent import run_agent
+from client import warm_up
+from compaction import as_dict
+from session_store import get_session_store
+from trace_view import show_trace
+from tracing import start_trace
 
 st.set_page_config(page_title="Agentic Function Calling", page_icon="🤖")
 
 st.title("🤖 Function Calling with LLM Tools")
 
-client = Groq(api_key=os.getenv("GROQ_API_KEY"))
+warm_up()
+
+# Earlier turns of this session's conversation, kept across reruns
+turns = get_session_store(st.session_state, "turns")
+
+
+def show_final_response(text):
+    st.subheader("LLM Final Response")
+    st.write(text)
+
+
+def show_turn(turn):
+    st.markdown(f"**You:** {turn['prompt']}")
+    with st.expander(f"Agent steps ({len(turn['steps'])})"):
+        for step in turn["steps"]:
+            st.write(step)
+    if turn["response"]:
+        show_final_response(turn["response"])
+    else:
+        st.info("No final response received.")
+
+
+def history():
+    """Messages of the stored turns, so a follow-up continues the conversation"""
+    messages = []
+    for turn in turns.values():
+        messages += turn["messages"]
+        if turn["response"]:
+            messages.append({"role": "assistant", "content": turn["response"]})
+    return messages
 
-tool_fn_map = {
-    "get_current_weather": get_current_weather,
-    "get_time": get_time,
-    "get_news": get_news,
-    "calculate_sum": calculate_sum,
-    "get_joke": get_joke,
-    "get_quote": get_quote
-}
+
+for turn in turns.values():
+    show_turn(turn)
+    st.divider()
 
 user_prompt = st.text_input("Enter your prompt:", "What's the weather in Chennai and tell me a joke?")
-if st.button("Submit"):
+stream = st.toggle("Stream the final response", value=True)
+time_limit = st.slider(
+    "Time limit (seconds)", 0, 60, 20,
+    help="Answer from the tool results gathered so far once this passes; 0 waits for every step.",
+)
+submitted = st.button("Submit")
+if turns and st.button("New conversation"):
+    turns.clear()
+    st.rerun()
+
+if submitted:
+    from groq import APIError
+
     with st.spinner("Thinking..."):
-        messages = [{"role": "user", "content": user_prompt}]
-        final_response = None
-
-        for step in range(3):  # prevent infinite loops
-            response = client.chat.completions.create(
-                model="llama3-70b-8192",
-                messages=messages,
-                tools=tools,
-                tool_choice="auto",
-                temperature=0,
-                max_tokens=300,
-            )
-            msg = response.choices[0].message
-            tool_calls = msg.tool_calls
-            st.write(msg)
-
-            if tool_calls:
-                messages.append(msg)  # Add the assistant's message containing tool_calls
-                for tool_call in tool_calls:
-                    tool_name = tool_call.function.name
-                    args = json.loads(tool_call.function.arguments)
-                    func = tool_fn_map.get(tool_name)
-
-                    if func:
-                        tool_output = func(**args) if args else func()
-                        messages.append({
-                            "role": "tool",
-                            "tool_call_id": tool_call.id,
-                            "content": tool_output
-                        })
+        st.markdown(f"**You:** {user_prompt}")
+        steps = st.container()
+        answer = st.empty()
+        tokens = []
+        earlier = history()
+
+        def show_token(token):
+            tokens.append(token)
+            with answer.container():
+                show_final_response("".join(tokens))
+
+        def show_step(message):
+            steps.write(message)
+            if message.tool_calls:  # text streamed with tool calls is not the final answer
+                tokens.clear()
+                answer.empty()
+
+        try:
+            with start_trace("agent") as trace:
+                final_response, messages = run_agent(
+                    user_prompt,
+                    on_message=show_step,
+                    on_token=show_token if stream else None,
+                    timeout=time_limit,
+                    history=earlier,
+                )
+        except APIError as e:
+            st.error(f"LLM request failed: {e}")
+            st.stop()
+
+        new_messages = [as_dict(message) for message in messages[len(earlier):]]
+        turns.put(trace.trace_id, {
+            "prompt": user_prompt,
+            "steps": [message for message in new_messages if message["role"] == "assistant"],
+            "messages": new_messages,
+            "response": final_response,
+            "trace": trace,
+        })
+        with answer.container():
+            if final_response:
+                show_final_response(final_response)
             else:
-                final_response = msg.content
-                break
-
-        if final_response:
-            st.subheader("LLM Final Response")
-            st.write(final_response)
-        else:
-            st.info("No final response received.")
+                st.info("No final response received.")
+
+if turns:
+    show_trace(turns.last()["trace"])
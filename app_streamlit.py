@@ -1,67 +1,88 @@
 import streamlit as st
-import json
-from tools import tools, get_current_weather, get_time, get_news, calculate_sum, get_joke, get_quote
-from groq import Groq
-import os
 from dotenv import load_dotenv
 
-load_dotenv()
+load_dotenv()  # before the project modules read their settings
+
+from tools import registry
+from registry import ToolArgumentError
+from client import create_completion, warm_up
+from executor import parse_arguments
+from routing import MODEL, route
+from session_store import get_session_store
+from tool_select import select_tools
+from trace_view import show_trace
+from tracing import span, start_trace
 
 st.set_page_config(page_title="Function Calling Demo", page_icon="🤖", layout="centered")
+warm_up()
 
 st.title("🤖 Function Calling with LLM Tools")
 st.markdown("""
 Enter your prompt below. The LLM will decide which tool(s) to call, and you'll see the tool name, parameters, and output for each call.
 """)
 
-client = Groq(
-    api_key=os.getenv("GROQ_API_KEY"),
-)
-
 
 user_prompt = st.text_input("Enter your prompt:", "What's the weather in Paris and tell me a joke?")
 
+# Results of this session's submissions, so reruns re-render instead of calling the LLM again
+results = get_session_store(st.session_state, "results")
+
+
+def run_prompt(prompt):
+    """Ask the LLM which tools to call and run them; returns the result to store and render"""
+    from groq import APIError
+
+    with start_trace("tool calls") as trace:
+        try:
+            messages = [{"role": "user", "content": prompt}]
+            response = create_completion(
+                messages=messages,
+                tools=select_tools(messages, registry),
+                tool_choice="auto",
+                **route("agent", "plan", {"model": MODEL, "temperature": 0, "max_tokens": 300}),
+            )
+        except APIError as e:
+            st.error(f"LLM request failed: {e}")
+            st.stop()
+        groq_response = response.choices[0].message
+        calls = []
+        for tool_call in groq_response.tool_calls or []:
+            tool_name = tool_call.function.name
+            arguments = tool_call.function.arguments or ""
+            call = {"name": tool_name, "args": arguments}  # shown as sent when they are not valid JSON
+            with span("tool", tool=tool_name, args_size=len(arguments)):
+                try:
+                    call["args"] = parse_arguments(tool_call)
+                    call["output"] = registry.call(tool_name, call["args"])
+                except ToolArgumentError as e:
+                    call["error"] = str(e)
+            calls.append(call)
+    return {"prompt": prompt, "response": str(groq_response), "calls": calls, "trace": trace}
+
+
+def show_result(result):
+    st.subheader("LLM Response")
+    st.code(result["response"], language="json")
+
+    if result["calls"]:
+        for i, call in enumerate(result["calls"]):
+            with st.expander(f"Tool Call {i+1}: {call['name']}"):
+                st.write("**Tool Name:**", call["name"])
+                st.write("**Parameters:**", call["args"])
+                st.write("**Output:**")
+                if "error" in call:
+                    st.warning(call["error"])
+                else:
+                    st.code(call["output"], language="json")
+    else:
+        st.info("No tool calls in response.")
+    show_trace(result["trace"])
+
+
 if st.button("Submit"):
     with st.spinner("Thinking..."):
-        response = client.chat.completions.create(
-            model="llama3-70b-8192",
-            messages=[{"role": "user", "content": user_prompt}],
-            temperature=0,
-            max_tokens=300,
-            tools=tools,
-            tool_choice="auto"
-        )
-        groq_response = response.choices[0].message
-        st.subheader("LLM Response")
-        st.code(groq_response, language="json")
-
-        if groq_response.tool_calls:
-            for i, tool_call in enumerate(groq_response.tool_calls):
-                tool_name = tool_call.function.name
-                args = json.loads(tool_call.function.arguments)
-                with st.expander(f"Tool Call {i+1}: {tool_name}"):
-                    st.write("**Tool Name:**", tool_name)
-                    st.write("**Parameters:**", args)
-                    st.write("**Output:**")
-                    if tool_name == "get_current_weather":
-                        result = get_current_weather(**args)
-                        st.code(result, language="json")
-                    elif tool_name == "get_time":
-                        result = get_time(**args)
-                        st.code(result, language="json")
-                    elif tool_name == "get_news":
-                        result = get_news(**args)
-                        st.code(result, language="json")
-                    elif tool_name == "calculate_sum":
-                        result = calculate_sum(**args)
-                        st.code(result, language="json")
-                    elif tool_name == "get_joke":
-                        result = get_joke()
-                        st.code(result, language="json")
-                    elif tool_name == "get_quote":
-                        result = get_quote()
-                        st.code(result, language="json")
-                    else:
-                        st.warning(f"Unknown tool: {tool_name}")
-        else:
-            st.info("No tool calls in response.") 
\ No newline at end of file
+        result = run_prompt(user_prompt)
+    results.put(result["trace"].trace_id, result)
+
+if results:
+    show_result(results.last())
@@ -0,0 +1,108 @@
+import asyncio
+import sys
+
+from async_tools import registry
+from client import acreate_completion
+from compaction import prepare_messages
+from deadline import AGENT_TIMEOUT, deadline, partial_answer, step_time_limit, timeout_errors
+from executor import arun_tool_calls
+from fused import FUSED_TOOL_CALLS, arun_fused_tool_calls
+from hedging import hedger
+from prompt_cache import lookup, store
+from singleflight import COALESCE_AGENT_PROMPTS, agent_flight, prompt_key
+from streaming import acollect_stream
+from tool_select import select_tools
+from agent import MAX_STEPS, agent_settings
+from tracing import annotate, span
+
+
+async def run_agent(user_prompt, max_steps=MAX_STEPS, on_message=None, timeout=None, on_token=None, on_tool_result=None):
+    """Async version of `agent.run_agent` built on the AsyncGroq tool layer.
+
+    Every completion, including the tool-side ones, waits on the shared
+    in-flight limiter, so many sessions can run on one event loop.
+    `on_token` streams answer text as in the sync version, and
+    `on_tool_result` receives each `role: tool` message as a step's tool
+    calls finish. Identical prompts without callbacks are coalesced, and
+    `timeout` is handled, as in the sync version.
+    """
+    cached = lookup(user_prompt, on_token)
+    if cached is not None:
+        return cached
+    timeout = (AGENT_TIMEOUT if timeout is None else timeout) or None
+    if COALESCE_AGENT_PROMPTS and on_token is None and on_tool_result is None:
+        (final_response, messages), shared = await agent_flight.ado(
+            (prompt_key(user_prompt), max_steps, timeout),
+            _run_agent, user_prompt, max_steps, on_message, timeout, None, None,
+        )
+        annotate(coalesced=shared)
+        return final_response, list(messages)
+    return await _run_agent(user_prompt, max_steps, on_message, timeout, on_token, on_tool_result)
+
+
+async def _complete_step(messages, tool_choice, on_token):
+    offered = select_tools(messages, registry)
+    response = await hedger.acall(
+        "agent" if on_token is None else None,
+        acreate_completion,
+        messages=prepare_messages(messages, registry, offered),
+        tools=offered,
+        tool_choice=tool_choice,
+        stream=on_token is not None,
+        **agent_settings(messages),
+    )
+    if on_token is not None:
+        return await acollect_stream(response, on_token)
+    return response.choices[0].message
+
+
+async def _final_answer(messages, on_token):
+    with span("agent.final"):
+        try:
+            return (await _complete_step(messages, "none", on_token)).content
+        except timeout_errors():
+            return partial_answer(messages)
+
+
+async def _run_agent(user_prompt, max_steps, on_message, timeout, on_token, on_tool_result):
+    messages = [{"role": "user", "content": user_prompt}]
+
+    with deadline(timeout):
+        try:
+            with deadline(step_time_limit(timeout)):
+                for step in range(max_steps):
+                    with span("agent.step", step=step + 1):
+                        msg = await _complete_step(messages, "auto", on_token)
+                        if on_message:
+                            on_message(msg)
+
+                        if not msg.tool_calls:
+                            store(user_prompt, msg.content, messages)
+                            return msg.content, messages
+                        messages.append(msg)  # Add the assistant's message containing tool_calls
+                        run = arun_fused_tool_calls if FUSED_TOOL_CALLS else arun_tool_calls
+                        results = await run(msg.tool_calls, registry)
+                        messages.extend(results)
+                        if on_tool_result:
+                            for result in results:
+                                on_tool_result(result)
+        except timeout_errors():
+            if timeout is None:
+                raise
+            annotate(deadline_exceeded=True)
+            return await _final_answer(messages, on_token), messages
+
+    return None, messages
+
+
+async def main(prompts):
+    results = await asyncio.gather(*(run_agent(prompt) for prompt in prompts))
+    for prompt, (final_response, _) in zip(prompts, results):
+        print(f"> {prompt}\n{final_response}\n")
+
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    asyncio.run(main(sys.argv[1:] or [input("Enter your prompt: ")]))
@@ -0,0 +1,73 @@
+from cache import tool_cache
+from client import acreate_completion
+from hedging import hedger
+from singleflight import COALESCE_TOOLS, tool_flight
+from tracing import annotate
+from tools import build_request, error_result, run_local
+from tools import registry as sync_registry
+
+
+async def _fetch(name, args, request):
+    response = await hedger.acall(name, acreate_completion, **request)
+    content = response.choices[0].message.content
+    tool_cache.set(name, args, request, content)
+    return content
+
+
+async def _complete(name, **args):
+    local = run_local(name, args)
+    if local is not None:
+        annotate(cache="local")
+        return local
+    request = build_request(name, args)
+    cached = tool_cache.get(name, args, request)
+    annotate(cache=tool_cache.status(name, cached))
+    if cached is not None:
+        return cached
+    try:
+        if name not in COALESCE_TOOLS:
+            return await _fetch(name, args, request)
+        # Identical calls already in flight share that completion
+        content, shared = await tool_flight.ado(tool_cache.key(name, args, request), _fetch, name, args, request)
+        annotate(coalesced=shared)
+        return content
+    except Exception as e:
+        return error_result(name, e)
+
+# Get the current weather
+async def get_current_weather(location):
+    """Get the current weather in a given location (LLM synthetic)"""
+    return await _complete("get_current_weather", location=location)
+
+# Additional tools
+
+async def get_time(location):
+    """Get the current time in a given location (local when the zone is known, else LLM synthetic)"""
+    return await _complete("get_time", location=location)
+
+async def get_news(topic):
+    """Get the latest news about a topic (LLM synthetic)"""
+    return await _complete("get_news", topic=topic)
+
+async def calculate_sum(a, b):
+    """Calculate the sum of two numbers (local, LLM synthetic with TOOL_EXECUTION=llm)"""
+    return await _complete("calculate_sum", a=a, b=b)
+
+async def get_joke():
+    """Get a random joke (LLM synthetic)"""
+    return await _complete("get_joke")
+
+async def get_quote():
+    """Get a random inspirational quote (LLM synthetic)"""
+    return await _complete("get_quote")
+
+
+# Same schemas and validation as the sync tools, dispatching to the coroutines above
+registry = sync_registry.bind({
+    "get_current_weather": get_current_weather,
+    "get_time": get_time,
+    "get_news": get_news,
+    "calculate_sum": calculate_sum,
+    "get_joke": get_joke,
+    "get_quote": get_quote,
+})
@@ -0,0 +1,123 @@
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from agent import run_agent
+from client import warm_up
+from compaction import tool_trace
+from tracing import start_trace
+
+
+def read_prompts(path):
+    """Yield `(id, prompt)` pairs from a JSONL file without loading it whole.
+
+    Each line is either `{"id": ..., "prompt": ...}` or a bare JSON string; the
+    line number is used when no id is given.
+    """
+    with open(path) as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            if isinstance(record, str):
+                record = {"prompt": record}
+            yield str(record.get("id", line_number)), record["prompt"]
+
+
+def completed_ids(path):
+    """Ids answered without error in the output file, so a restarted run skips them.
+
+    Prompts that failed are run again, so their error rows are dropped along
+    with a partial last line left by a killed run; each id then appears once
+    and the next result starts on a line of its own.
+    """
+    if not os.path.exists(path):
+        return set()
+    done = set()
+    kept = []
+    rewrite = False
+    with open(path, "rb") as f:
+        for line in f:
+            if not line.endswith(b"\n"):
+                rewrite = True
+                break
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                kept.append(line)
+                continue
+            if isinstance(record, dict) and "error" in record:
+                rewrite = True
+                continue
+            if isinstance(record, dict) and "id" in record:
+                done.add(record["id"])
+            kept.append(line)
+    if rewrite:
+        partial = f"{path}.partial"
+        with open(partial, "wb") as f:
+            f.writelines(kept)
+        os.replace(partial, path)  # a crash mid-rewrite leaves the old file intact
+    return done
+
+
+def run_prompt(prompt_id, prompt):
+    start = time.perf_counter()
+    step_times = []
+    result = {"id": prompt_id, "prompt": prompt}
+    try:
+        with start_trace("batch") as trace:
+            final_response, messages = run_agent(
+                prompt,
+                on_message=lambda msg: step_times.append(round(time.perf_counter() - start, 4)),
+            )
+        result.update(response=final_response, tool_calls=tool_trace(messages), usage=trace.totals())
+    except Exception as e:
+        result["error"] = str(e)
+    result["step_times"] = step_times
+    result["latency"] = round(time.perf_counter() - start, 4)
+    return result
+
+
+def run_batch(input_path, output_path, workers=4):
+    """Run every prompt in `input_path` through the agent and append results to `output_path`.
+
+    At most `2 * workers` prompts are pending at once, so the input is streamed.
+    Each result is flushed as soon as it is ready; the output file doubles as
+    the checkpoint for resuming an interrupted run.
+    """
+    warm_up()
+    done = completed_ids(output_path)
+    lock = threading.Lock()
+    count = 0
+    start = time.perf_counter()
+
+    with open(output_path, "a") as out, ThreadPoolExecutor(max_workers=workers) as pool:
+        def write(future):
+            nonlocal count
+            with lock:
+                out.write(json.dumps(future.result()) + "\n")
+                out.flush()
+                count += 1
+
+        pending = set()
+        for prompt_id, prompt in read_prompts(input_path):
+            if prompt_id in done:
+                continue
+            if len(pending) >= 2 * workers:
+                _, pending = wait(pending, return_when=FIRST_COMPLETED)
+            future = pool.submit(run_prompt, prompt_id, prompt)
+            future.add_done_callback(write)
+            pending.add(future)
+        wait(pending)
+
+    elapsed = time.perf_counter() - start
+    rate = count / elapsed if elapsed else 0.0
+    print(
+        f"{count} prompts in {elapsed:.2f}s ({rate:.2f} prompts/s), {len(done)} skipped from checkpoint",
+        file=sys.stderr,
+    )
+    return count
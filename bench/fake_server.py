@@ -0,0 +1,290 @@
+"""Local stand-in for the Groq chat completions API.
+
+Serves `POST /openai/v1/chat/completions` with scripted answers and a
+configurable latency distribution, so the tools and agent loops can be
+benchmarked without network access or API quota. Point the clients at it with
+`GROQ_BASE_URL=http://127.0.0.1:<port>`.
+
+    python -m bench.fake_server --port 8900 --latency lognormal --median 0.3
+"""
+
+import argparse
+import json
+import math
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Tool calls the fake model makes when a keyword appears in the user prompt
+DEFAULT_SCRIPT = {
+    "weather": [{"name": "get_current_weather", "arguments": {"location": "Chennai"}}],
+    "time": [{"name": "get_time", "arguments": {"location": "Tokyo"}}],
+    "news": [{"name": "get_news", "arguments": {"topic": "AI"}}],
+    "add": [{"name": "calculate_sum", "arguments": {"a": 5, "b": 7}}],
+    "sum": [{"name": "calculate_sum", "arguments": {"a": 5, "b": 7}}],
+    "joke": [{"name": "get_joke", "arguments": {}}],
+    "quote": [{"name": "get_quote", "arguments": {}}],
+}
+
+# Canned tool-side answers, picked by the "You are a ... API" prompt
+TOOL_ANSWERS = {
+    "weather": {"location": "Chennai", "temperature": 91},
+    "time": {"location": "Tokyo", "time": "3:45 PM"},
+    "news": {"topic": "AI", "headline": "New model tops reasoning benchmarks"},
+    "math": {"a": 5, "b": 7, "sum": 12},
+    "joke": {"joke": "Why do programmers prefer dark mode? Because light attracts bugs."},
+    "quote": {"quote": "Simplicity is the soul of efficiency."},
+}
+
+
+# Latency multiplier per model, so routing profiles can be compared; unlisted models use 1.0
+MODEL_SPEEDS = {
+    "llama3-8b-8192": 0.35,
+}
+
+
+class Latency:
+    """Latency distribution in seconds: fixed, uniform or lognormal, plus an optional slow tail"""
+
+    def __init__(self, kind="fixed", median=0.2, sigma=0.5, spread=0.1, tail_prob=0.0, tail=2.0, seed=None):
+        self.kind = kind
+        self.median = median
+        self.sigma = sigma
+        self.spread = spread
+        self.tail_prob = tail_prob
+        self.tail = tail
+        self.random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def sample(self):
+        with self._lock:
+            if self.tail_prob and self.random.random() < self.tail_prob:
+                return self.tail
+            if self.kind == "uniform":
+                return max(0.0, self.random.uniform(self.median - self.spread, self.median + self.spread))
+            if self.kind == "lognormal":
+                return self.random.lognormvariate(math.log(self.median), self.sigma)
+            return self.median
+
+
+def _text(content):
+    if isinstance(content, list):
+        return " ".join(part.get("text", "") for part in content if isinstance(part, dict))
+    return content or ""
+
+
+def _tokens(text):
+    return max(1, len(text) // 4)
+
+
+def fused_results(prompt):
+    """Answers for a fused request, one per `- tool_call_id <id>: <tool prompt>` line"""
+    results = []
+    for line in prompt.splitlines():
+        match = re.match(r"- tool_call_id (\S+): (.*)", line)
+        if match:
+            answer = next((a for kind, a in TOOL_ANSWERS.items() if f"{kind} api" in match[2].lower()), {"result": "ok"})
+            results.append({"tool_call_id": match[1], "result": answer})
+    return results
+
+
+def scripted_message(body, script):
+    """Decide what the fake model answers for a request body"""
+    messages = body.get("messages", [])
+    if body.get("tools"):
+        last_user = max((i for i, m in enumerate(messages) if m.get("role") == "user"), default=0)
+        messages = messages[last_user:]  # only the latest turn of a conversation
+        answered = any(m.get("role") == "tool" for m in messages) or body.get("tool_choice") == "none"
+        prompt = next((_text(m.get("content")) for m in messages if m.get("role") == "user"), "").lower()
+        offered = {tool["function"]["name"] for tool in body["tools"]}
+        calls = [
+            call for keyword, calls in script.items() if keyword in prompt for call in calls
+            if call["name"] in offered
+        ]
+        if calls and not answered:
+            return {
+                "role": "assistant",
+                "content": None,
+                "tool_calls": [
+                    {
+                        "id": f"call_{uuid.uuid4().hex[:12]}",
+                        "type": "function",
+                        "function": {"name": call["name"], "arguments": json.dumps(call["arguments"])},
+                    }
+                    for call in calls
+                ],
+            }
+        results = [_text(m.get("content")) for m in messages if m.get("role") == "tool"]
+        answer = "Here is what I found: " + "; ".join(results) if results else "I can answer that without tools."
+        return {"role": "assistant", "content": answer}
+    prompt = _text(messages[-1].get("content")).lower() if messages else ""
+    if "tool_call_id" in prompt:
+        results = fused_results(_text(messages[-1].get("content")))
+        return {"role": "assistant", "content": json.dumps({"results": results})}
+    for kind, answer in TOOL_ANSWERS.items():
+        if f"{kind} api" in prompt:
+            return {"role": "assistant", "content": json.dumps(answer)}
+    return {"role": "assistant", "content": json.dumps({"result": "ok"})}
+
+
+class FakeGroqHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real API
+    disable_nagle_algorithm = True  # headers and body go out in separate writes
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, payload):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        if not self.path.endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+            return
+        server = self.server
+        with server.lock:
+            server.requests += 1
+        if server.error_rate and server.latency.random.random() < server.error_rate:
+            self.send_response(429)
+            self.send_header("Retry-After", "0.05")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        message = scripted_message(body, server.script)
+        prompt_tokens = _tokens(json.dumps(body.get("messages", [])) + json.dumps(body.get("tools", [])))
+        completion_tokens = _tokens(message.get("content") or json.dumps(message.get("tool_calls")))
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        }
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        model = body.get("model", "fake")
+        latency = server.latency.sample() * server.model_speeds.get(model, 1.0)
+
+        if body.get("stream"):
+            self._stream(completion_id, model, message, usage, latency)
+            return
+        time.sleep(latency)
+        self._send_json(200, {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": message,
+                "finish_reason": "tool_calls" if message.get("tool_calls") else "stop",
+            }],
+            "usage": usage,
+        })
+
+    def _stream(self, completion_id, model, message, usage, latency):
+        """Send the message as SSE chunks, spending half the latency before the first one"""
+        if message.get("tool_calls"):
+            deltas = [
+                {"tool_calls": [{"index": i, **call}]} for i, call in enumerate(message["tool_calls"])
+            ]
+        else:
+            words = message["content"].split(" ")
+            deltas = [{"content": word + (" " if i < len(words) - 1 else "")} for i, word in enumerate(words)]
+        deltas[0]["role"] = "assistant"
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        time.sleep(latency / 2)
+        per_chunk = latency / 2 / len(deltas)
+        for i, delta in enumerate(deltas):
+            last = i == len(deltas) - 1
+            chunk = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "delta": delta,
+                    "finish_reason": ("tool_calls" if message.get("tool_calls") else "stop") if last else None,
+                }],
+            }
+            if last:
+                chunk["x_groq"] = {"id": completion_id, "usage": usage}
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            self.wfile.flush()
+            time.sleep(per_chunk)
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+
+class FakeGroqServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024  # the default backlog of 5 adds SYN retry stalls under load
+
+    def handle_error(self, request, client_address):
+        pass  # clients dropping keep-alive connections at exit is expected
+
+
+def start_server(port=0, latency=None, script=None, error_rate=0.0):
+    """Start the fake server on a background thread and return `(server, base_url)`"""
+    server = FakeGroqServer(("127.0.0.1", port), FakeGroqHandler)
+    server.latency = latency or Latency()
+    server.script = script or DEFAULT_SCRIPT
+    server.error_rate = error_rate
+    server.model_speeds = dict(MODEL_SPEEDS)
+    server.requests = 0
+    server.lock = threading.Lock()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def add_latency_arguments(parser):
+    parser.add_argument("--latency", choices=["fixed", "uniform", "lognormal"], default="fixed")
+    parser.add_argument("--median", type=float, default=0.2, help="Median latency in seconds (default 0.2)")
+    parser.add_argument("--sigma", type=float, default=0.5, help="Lognormal shape (default 0.5)")
+    parser.add_argument("--spread", type=float, default=0.1, help="Half-width of the uniform range")
+    parser.add_argument("--tail-prob", type=float, default=0.0, help="Probability of a slow response")
+    parser.add_argument("--tail", type=float, default=2.0, help="Latency of a slow response in seconds")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 429")
+    parser.add_argument("--script", help="JSON file mapping prompt keywords to tool calls")
+
+
+def latency_from_args(args):
+    return Latency(args.latency, args.median, args.sigma, args.spread, args.tail_prob, args.tail, args.seed)
+
+
+def script_from_args(args):
+    if not args.script:
+        return None
+    with open(args.script) as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake Groq chat completions server")
+    parser.add_argument("--port", type=int, default=8900)
+    add_latency_arguments(parser)
+    args = parser.parse_args()
+    server, url = start_server(args.port, latency_from_args(args), script_from_args(args), args.error_rate)
+    print(f"Fake Groq API on {url}; set GROQ_BASE_URL={url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+"""Latency and throughput benchmark for the tools and agent loops.
+
+Runs against the fake Groq server from `bench.fake_server` (started in-process
+unless --url is given), so no API quota is spent:
+
+    python -m bench.load --target agent --concurrency 1,4,16 --requests 40
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from bench.fake_server import add_latency_arguments, latency_from_args, script_from_args, start_server
+
+DEFAULT_PROMPT = "What's the weather in Chennai and tell me a joke and a quote?"
+
+TOOL_CALLS = [
+    ("get_current_weather", {"location": "Chennai"}),
+    ("get_time", {"location": "Atlantis"}),
+    ("get_news", {"topic": "AI"}),
+    ("calculate_sum", {"a": 5, "b": 7}),
+    ("get_joke", {}),
+    ("get_quote", {}),
+]
+
+
+def percentile(values, p):
+    """Nearest-rank percentile"""
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+
+def summarize(latencies, elapsed, steps):
+    return {
+        "requests": len(latencies),
+        "throughput": len(latencies) / elapsed if elapsed else 0.0,
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        "p99": percentile(latencies, 99),
+        "steps": {
+            name: {"p50": percentile(values, 50), "p95": percentile(values, 95)}
+            for name, values in sorted(steps.items())
+        },
+    }
+
+
+def run_tools(concurrency, requests):
+    """Call the tools.py functions directly, round-robin over every tool"""
+    from tools import registry
+
+    steps = defaultdict(list)
+
+    def one(i):
+        name, args = TOOL_CALLS[i % len(TOOL_CALLS)]
+        start = time.perf_counter()
+        registry.call(name, args)
+        latency = time.perf_counter() - start
+        steps[name].append(latency)
+        return latency
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = list(pool.map(one, range(requests)))
+    return latencies, time.perf_counter() - start, steps
+
+
+def run_agent_loop(concurrency, requests, prompt):
+    """Run the sync agent loop; step N is the time from the previous step to the Nth completion"""
+    from agent import run_agent
+
+    steps = defaultdict(list)
+
+    def one(_):
+        start = last = time.perf_counter()
+        marks = []
+
+        def on_message(msg):
+            nonlocal last
+            now = time.perf_counter()
+            marks.append(now - last)
+            last = now
+
+        run_agent(prompt, on_message=on_message)
+        for i, duration in enumerate(marks, 1):
+            steps[f"step {i}"].append(duration)
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = list(pool.map(one, range(requests)))
+    return latencies, time.perf_counter() - start, steps
+
+
+async def run_async_agent_loop(concurrency, requests, prompt):
+    from async_agent import run_agent
+
+    steps = defaultdict(list)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            start = last = time.perf_counter()
+            marks = []
+
+            def on_message(msg):
+                nonlocal last
+                now = time.perf_counter()
+                marks.append(now - last)
+                last = now
+
+            await run_agent(prompt, on_message=on_message)
+            for i, duration in enumerate(marks, 1):
+                steps[f"step {i}"].append(duration)
+            return time.perf_counter() - start
+
+    start = time.perf_counter()
+    latencies = await asyncio.gather(*(one() for _ in range(requests)))
+    return list(latencies), time.perf_counter() - start, steps
+
+
+async def run_async_levels(levels, requests, prompt):
+    # One event loop for every level: the async client and limiter are bound to it
+    return [await run_async_agent_loop(concurrency, requests, prompt) for concurrency in levels]
+
+
+def print_report(target, results):
+    print(f"\n{target}: end-to-end latency (s) and throughput")
+    print(f"{'conc':>5} {'n':>5} {'req/s':>8} {'p50':>8} {'p95':>8} {'p99':>8}")
+    for concurrency, summary in results.items():
+        print(
+            f"{concurrency:>5} {summary['requests']:>5} {summary['throughput']:>8.2f} "
+            f"{summary['p50']:>8.3f} {summary['p95']:>8.3f} {summary['p99']:>8.3f}"
+        )
+    for concurrency, summary in results.items():
+        parts = [f"{name} {s['p50']:.3f}/{s['p95']:.3f}" for name, s in summary["steps"].items()]
+        print(f"  conc {concurrency} per-step p50/p95: " + ", ".join(parts))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the tools and agent loops against a fake Groq server")
+    parser.add_argument("--target", choices=["tools", "agent", "async-agent"], default="agent")
+    parser.add_argument("--concurrency", default="1,4,16", help="Comma-separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=32, help="Requests per concurrency level")
+    parser.add_argument("--prompt", default=DEFAULT_PROMPT)
+    parser.add_argument("--url", help="Use an already running fake server instead of starting one")
+    parser.add_argument("--cache", action="store_true", help="Keep the tool result and prompt caches enabled")
+    parser.add_argument("--fused", action="store_true", help="Fuse each step's synthetic tool calls into one request")
+    parser.add_argument("--hedge", choices=["tools", "all"], help="Hedge slow requests (see HEDGE_REQUESTS)")
+    parser.add_argument("--keys", type=int, default=0, help="Spread requests over this many API keys (client pool)")
+    parser.add_argument("--rpm", type=float, default=0, help="Requests per minute allowed per key (default 0, unlimited)")
+    parser.add_argument("--json", help="Also write the results to this JSON file")
+    add_latency_arguments(parser)
+    args = parser.parse_args()
+
+    url = args.url
+    if url is None:
+        _, url = start_server(0, latency_from_args(args), script_from_args(args), args.error_rate)
+    # The project modules read these at import time, so set them first
+    os.environ["GROQ_BASE_URL"] = url
+    os.environ.setdefault("GROQ_API_KEY", "fake")
+    os.environ["GROQ_REQUESTS_PER_MINUTE"] = str(args.rpm)
+    os.environ["GROQ_TOKENS_PER_MINUTE"] = "0"
+    if args.keys:
+        os.environ["GROQ_API_KEYS"] = ",".join(f"fake-{i}" for i in range(args.keys))
+    if not args.cache:
+        os.environ["PROMPT_CACHE_TTL"] = "0"
+    if args.fused:
+        os.environ["FUSED_TOOL_CALLS"] = "1"
+    os.environ["HEDGE_REQUESTS"] = args.hedge or "off"
+
+    from cache import tool_cache
+
+    if not args.cache:
+        tool_cache.ttls = {}
+
+    levels = [int(level) for level in args.concurrency.split(",")]
+    # Warm up first: the SDK builds its response models lazily on first use,
+    # which would otherwise show up as a latency spike in the first level
+    if args.target == "tools":
+        run_tools(1, len(TOOL_CALLS))
+    else:
+        run_agent_loop(1, 1, args.prompt)
+    if args.target == "tools":
+        runs = [run_tools(concurrency, args.requests) for concurrency in levels]
+    elif args.target == "agent":
+        runs = [run_agent_loop(concurrency, args.requests, args.prompt) for concurrency in levels]
+    else:
+        runs = asyncio.run(run_async_levels(levels, args.requests, args.prompt))
+    results = {concurrency: summarize(*run) for concurrency, run in zip(levels, runs)}
+
+    from hedging import hedger
+    from singleflight import agent_flight, tool_flight
+
+    coalescing = {"tools": tool_flight.stats(), "agent": agent_flight.stats()}
+    hedging = hedger.stats()
+    print_report(args.target, results)
+    print(f"  coalesced tool calls: {coalescing['tools']['collapsed']} of "
+          f"{coalescing['tools']['executed'] + coalescing['tools']['collapsed']}")
+    if args.hedge:
+        print(f"  hedged requests: {hedging['fired']} of {hedging['requests']} "
+              f"({hedging['won']} won, {hedging['over_budget']} over budget)")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(
+                {"target": args.target, "results": results, "coalescing": coalescing, "hedging": hedging}, f, indent=2
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""Replay a recorded cassette through the agent loop as a fixed workload.
+
+Record real sessions first, for example with the agentic app:
+
+    CASSETTE_MODE=record CASSETTE_PATH=sessions.jsonl streamlit run app_agentic.py
+
+then rerun every recorded prompt offline, optionally with the recorded
+latencies, and compare against a saved baseline:
+
+    python -m bench.replay sessions.jsonl --json baseline.json
+    python -m bench.replay sessions.jsonl --baseline baseline.json --tolerance 0.2
+
+With `--baseline` the exit status is 1 when p50 or p95 latency, or LLM
+requests per run, grew by more than the tolerance.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from bench.load import percentile
+
+
+def recorded_prompts(path):
+    """`(prompt, streamed)` for the first agent completion of every recorded session, in order"""
+    prompts = []
+    with open(path) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            body = json.loads(line)["request"]["body"]
+            if not isinstance(body, dict) or not body.get("tools"):
+                continue  # a synthetic tool completion
+            messages = body.get("messages") or []
+            if len(messages) == 1 and messages[0].get("role") == "user":
+                prompts.append((messages[0]["content"], bool(body.get("stream"))))
+    return prompts
+
+
+def replay(prompts, concurrency, repeat):
+    from agent import run_agent
+    from tracing import start_trace
+
+    def one(item):
+        prompt, streamed = item
+        start = time.perf_counter()
+        with start_trace("replay") as trace:
+            final_response, _ = run_agent(prompt, on_token=(lambda text: None) if streamed else None)
+        return time.perf_counter() - start, trace.totals(), final_response is not None
+
+    workload = prompts * repeat
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        runs = list(pool.map(one, workload))
+    elapsed = time.perf_counter() - start
+
+    latencies = [latency for latency, _, _ in runs]
+    return {
+        "runs": len(runs),
+        "answered": sum(answered for _, _, answered in runs),
+        "throughput": len(runs) / elapsed,
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        "llm_requests": sum(totals["llm_requests"] for _, totals, _ in runs) / len(runs),
+        "tool_calls": sum(totals["tool_calls"] for _, totals, _ in runs) / len(runs),
+    }
+
+
+def regressions(result, baseline, tolerance):
+    return [
+        f"{key}: {baseline[key]:.3f} -> {result[key]:.3f}"
+        for key in ("p50", "p95", "llm_requests")
+        if result[key] > baseline[key] * (1 + tolerance)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a cassette through the agent loop")
+    parser.add_argument("cassette", help="Cassette recorded with CASSETTE_MODE=record")
+    parser.add_argument("--latency", action="store_true", help="Replay with the recorded latencies")
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=1, help="Times to run each recorded prompt")
+    parser.add_argument("--json", help="Also write the results to this JSON file")
+    parser.add_argument("--baseline", help="Results JSON of an earlier replay to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="Allowed relative growth (default 0.1)")
+    args = parser.parse_args()
+
+    os.environ["CASSETTE_MODE"] = "replay"
+    os.environ["CASSETTE_PATH"] = args.cassette
+    os.environ["CASSETTE_LATENCY"] = "1" if args.latency else "0"
+    os.environ["GROQ_REQUESTS_PER_MINUTE"] = "0"
+    os.environ["GROQ_TOKENS_PER_MINUTE"] = "0"
+    os.environ["PROMPT_CACHE_TTL"] = "0"
+
+    from cache import tool_cache
+    from cassette import get_cassette
+
+    tool_cache.ttls = {}  # every run should reach the recorded responses
+    prompts = recorded_prompts(args.cassette)
+    if not prompts:
+        parser.error(f"no agent sessions recorded in {args.cassette}")
+
+    result = replay(prompts, args.concurrency, args.repeat)
+    result["cassette"] = get_cassette().stats()
+
+    print(f"\nreplayed {result['runs']} agent runs from {args.cassette} ({len(prompts)} recorded prompts)")
+    print(f"answered {result['answered']}, {result['throughput']:.2f} runs/s, "
+          f"p50 {result['p50']:.3f}s, p95 {result['p95']:.3f}s")
+    print(f"{result['llm_requests']:.1f} LLM requests and {result['tool_calls']:.1f} tool calls per run")
+    print("cassette matches: " + ", ".join(f"{k} {v}" for k, v in result["cassette"].items()))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            found = regressions(result, json.load(f), args.tolerance)
+        for line in found:
+            print(f"regression {line}")
+        if found:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
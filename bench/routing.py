@@ -0,0 +1,101 @@
+"""Compare routing profiles on latency and token usage.
+
+Runs the sync agent loop under each profile in `routing.PROFILES` against the
+fake Groq server, where smaller models answer faster (see
+`bench.fake_server.MODEL_SPEEDS`):
+
+    python -m bench.routing --profiles default,fast-tools,small --concurrency 8 --requests 32
+"""
+
+import argparse
+import json
+import os
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from bench.fake_server import add_latency_arguments, latency_from_args, script_from_args, start_server
+from bench.load import DEFAULT_PROMPT, percentile
+
+
+def run_profile(concurrency, requests, prompt):
+    from agent import run_agent
+    from tracing import start_trace
+
+    def one(_):
+        start = time.perf_counter()
+        with start_trace("bench") as trace:
+            run_agent(prompt)
+        models = Counter(span.attributes.get("model") for span in trace.spans if span.name == "llm.request")
+        return time.perf_counter() - start, trace.totals(), models
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        runs = list(pool.map(one, range(requests)))
+    elapsed = time.perf_counter() - start
+
+    latencies = [latency for latency, _, _ in runs]
+    models = sum((models for _, _, models in runs), Counter())
+    return {
+        "requests": requests,
+        "throughput": requests / elapsed,
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        "prompt_tokens": sum(totals["prompt_tokens"] for _, totals, _ in runs) / requests,
+        "completion_tokens": sum(totals["completion_tokens"] for _, totals, _ in runs) / requests,
+        "llm_requests": sum(totals["llm_requests"] for _, totals, _ in runs) / requests,
+        "models": dict(models),
+    }
+
+
+def print_report(results):
+    print("\nrouting profiles: end-to-end latency (s), tokens and LLM requests per agent run")
+    print(f"{'profile':>12} {'req/s':>8} {'p50':>8} {'p95':>8} {'prompt':>8} {'compl':>8} {'calls':>6}  models")
+    for name, r in results.items():
+        models = ", ".join(f"{model} x{count}" for model, count in sorted(r["models"].items()))
+        print(
+            f"{name:>12} {r['throughput']:>8.2f} {r['p50']:>8.3f} {r['p95']:>8.3f} "
+            f"{r['prompt_tokens']:>8.0f} {r['completion_tokens']:>8.0f} {r['llm_requests']:>6.1f}  {models}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare routing profiles against a fake Groq server")
+    parser.add_argument("--profiles", help="Comma-separated profiles (default: all)")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--requests", type=int, default=16, help="Agent runs per profile")
+    parser.add_argument("--prompt", default=DEFAULT_PROMPT)
+    parser.add_argument("--json", help="Also write the results to this JSON file")
+    add_latency_arguments(parser)
+    args = parser.parse_args()
+
+    _, url = start_server(0, latency_from_args(args), script_from_args(args), args.error_rate)
+    os.environ["GROQ_BASE_URL"] = url
+    os.environ.setdefault("GROQ_API_KEY", "fake")
+    os.environ["GROQ_REQUESTS_PER_MINUTE"] = "0"
+    os.environ["GROQ_TOKENS_PER_MINUTE"] = "0"
+    os.environ["PROMPT_CACHE_TTL"] = "0"
+
+    import routing
+    from cache import tool_cache
+
+    tool_cache.ttls = {}  # every run should reach the models
+    profiles = args.profiles.split(",") if args.profiles else list(routing.PROFILES)
+    unknown = [name for name in profiles if name not in routing.PROFILES]
+    if unknown:
+        parser.error(f"unknown profiles: {', '.join(unknown)}")
+    run_profile(1, 1, args.prompt)  # warm up the client
+
+    results = {}
+    for name in profiles:
+        routing.ROUTING_PROFILE = name
+        results[name] = run_profile(args.concurrency, args.requests, args.prompt)
+
+    print_report(results)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Cold-start benchmark: import time and time to the first request.
+
+Every measurement runs in a fresh interpreter, so nothing is cached between
+samples. The first tool call and agent run go to an in-process fake Groq
+server, so only client setup and the project's own code are measured:
+
+    python -m bench.startup --runs 5
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from bench.fake_server import Latency, start_server
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODULES = ["tools", "async_tools", "agent", "async_agent", "batch", "server"]
+
+# Each snippet prints the seconds its timed part took
+IMPORT = "import time; start = time.perf_counter(); import {module}; print(time.perf_counter() - start)"
+FIRST_TOOL_CALL = (
+    "import time; start = time.perf_counter(); from tools import get_current_weather; "
+    "get_current_weather('Chennai'); print(time.perf_counter() - start)"
+)
+FIRST_AGENT_RUN = (
+    "import time; start = time.perf_counter(); from agent import run_agent; "
+    "run_agent('What is the weather in Chennai?'); print(time.perf_counter() - start)"
+)
+
+
+def sample(code, env):
+    """`(timed seconds, whole process seconds)` for one fresh interpreter running `code`"""
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    )
+    return float(result.stdout.strip().splitlines()[-1]), time.perf_counter() - start
+
+
+def measure(code, env, runs):
+    samples = [sample(code, env) for _ in range(runs)]
+    return {
+        "median": statistics.median(timed for timed, _ in samples),
+        "max": max(timed for timed, _ in samples),
+        "process": statistics.median(process for _, process in samples),
+    }
+
+
+def print_report(results):
+    print("\nstartup: median / max of the timed part and median whole-process time (ms)")
+    print(f"{'measurement':>22} {'median':>8} {'max':>8} {'process':>8}")
+    for name, r in results.items():
+        print(f"{name:>22} {r['median'] * 1000:>8.1f} {r['max'] * 1000:>8.1f} {r['process'] * 1000:>8.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure import time and first-request time in fresh processes")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per measurement")
+    parser.add_argument("--modules", help=f"Comma-separated modules to import (default: {','.join(MODULES)})")
+    parser.add_argument("--json", help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    _, url = start_server(0, Latency("fixed", 0.0))
+    env = dict(
+        os.environ,
+        GROQ_BASE_URL=url,
+        GROQ_API_KEY=os.getenv("GROQ_API_KEY", "fake"),
+        GROQ_REQUESTS_PER_MINUTE="0",
+        GROQ_TOKENS_PER_MINUTE="0",
+        PROMPT_CACHE_TTL="0",
+    )
+
+    sample("print(0)", env)  # warm the OS file cache so the first module is not penalised
+    results = {}
+    for module in args.modules.split(",") if args.modules else MODULES:
+        results[f"import {module}"] = measure(IMPORT.format(module=module), env, args.runs)
+    results["main.py --help"] = measure(
+        "import runpy, sys, time; start = time.perf_counter(); sys.argv = ['main.py', '--help']\n"
+        "try:\n    runpy.run_path('main.py', run_name='__main__')\n"
+        "except SystemExit:\n    pass\nprint(time.perf_counter() - start)",
+        env,
+        args.runs,
+    )
+    results["first tool call"] = measure(FIRST_TOOL_CALL, env, args.runs)
+    results["first agent run"] = measure(FIRST_AGENT_RUN, env, args.runs)
+
+    print_report(results)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
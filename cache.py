@@ -0,0 +1,167 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+# Seconds a tool result stays fresh; None opts the tool out of caching
+TOOL_TTLS = {
+    "get_current_weather": 600,
+    "get_time": 60,
+    "get_news": 900,
+    "calculate_sum": 24 * 3600,
+    "get_joke": None,
+    "get_quote": None,
+}
+
+MAX_ENTRIES = int(os.getenv("TOOL_CACHE_SIZE", "1024"))
+
+
+def normalize_args(args):
+    """Canonical JSON for tool arguments so trivially different inputs share a key"""
+    def normalize(value):
+        if isinstance(value, str):
+            return " ".join(value.split()).casefold()
+        if isinstance(value, float) and value.is_integer():
+            return int(value)
+        return value
+
+    return json.dumps({k: normalize(v) for k, v in args.items()}, sort_keys=True)
+
+
+class MemoryStore:
+    """In-process LRU store with per-entry expiry"""
+
+    def __init__(self, max_entries=MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (time.time() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class SQLiteStore:
+    """On-disk LRU store, so cached results survive app restarts"""
+
+    def __init__(self, path, max_entries=MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS tool_cache "
+            "(key TEXT PRIMARY KEY, value TEXT, expires_at REAL, used_at REAL)"
+        )
+        self._conn.commit()
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM tool_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[1] < now:
+                self._conn.execute("DELETE FROM tool_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute("UPDATE tool_cache SET used_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            return row[0]
+
+    def set(self, key, value, ttl):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO tool_cache VALUES (?, ?, ?, ?)",
+                (key, value, now + ttl, now),
+            )
+            self._conn.execute(
+                "DELETE FROM tool_cache WHERE key IN "
+                "(SELECT key FROM tool_cache ORDER BY used_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM tool_cache")
+            self._conn.commit()
+
+
+class ToolCache:
+    """Result cache for synthetic tools keyed on (tool, args, model, temperature)"""
+
+    def __init__(self, store=None, ttls=TOOL_TTLS):
+        self.store = store if store is not None else MemoryStore()
+        self.ttls = ttls
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def key(self, name, args, request):
+        return json.dumps([name, normalize_args(args), request["model"], request["temperature"]])
+
+    def get(self, name, args, request):
+        value = self.peek(name, args, request)
+        self.count(name, value is not None)
+        return value
+
+    def peek(self, name, args, request):
+        """`get` without counting a hit or miss, for callers that count once they know the outcome"""
+        if self.ttls.get(name) is None:
+            return None
+        return self.store.get(self.key(name, args, request))
+
+    def count(self, name, hit):
+        if self.ttls.get(name) is None:
+            return
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def set(self, name, args, request, value):
+        ttl = self.ttls.get(name)
+        if ttl is not None:
+            self.store.set(self.key(name, args, request), value, ttl)
+
+    def status(self, name, value):
+        """Outcome of a lookup for tracing: 'off', 'hit' or 'miss'"""
+        if self.ttls.get(name) is None:
+            return "off"
+        return "miss" if value is None else "hit"
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses}
+
+
+def _default_store():
+    path = os.getenv("TOOL_CACHE_PATH")
+    return SQLiteStore(path) if path else MemoryStore()
+
+
+tool_cache = ToolCache(_default_store())
@@ -0,0 +1,320 @@
+"""Record Groq traffic to a cassette file and replay it without network access.
+
+The shared clients in `client.py` send their requests through one of these
+httpx transports when CASSETTE_MODE is set. A cassette is a JSON lines file
+with one request/response pair per line, including the response's arrival
+time and, for streams, when each chunk arrived.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import defaultdict, deque
+
+import httpx
+
+# "record" saves every request/response pair, "replay" answers from the cassette
+CASSETTE_MODE = os.getenv("CASSETTE_MODE", "")
+CASSETTE_PATH = os.getenv("CASSETTE_PATH", "cassette.jsonl")
+# Replay with the recorded latencies instead of answering immediately
+CASSETTE_LATENCY = os.getenv("CASSETTE_LATENCY", "0") == "1"
+
+# Response headers worth keeping; everything else is request-specific or secret
+KEEP_HEADERS = {"content-type", "retry-after", "x-ratelimit-remaining-requests", "x-ratelimit-remaining-tokens"}
+
+if CASSETTE_MODE not in ("", "record", "replay"):
+    raise ValueError(f"Unknown CASSETTE_MODE {CASSETTE_MODE!r}; use record or replay")
+
+
+def _body(request):
+    try:
+        return json.loads(request.content or b"null")
+    except ValueError:
+        return request.content.decode(errors="replace")
+
+
+def exact_key(method, path, body):
+    return json.dumps([method, path, body], sort_keys=True)
+
+
+def loose_key(method, path, body):
+    """Key that ignores tool results and assistant text, which may drift between runs (the time, a joke)"""
+    if not isinstance(body, dict):
+        return exact_key(method, path, None)
+    messages = [
+        [
+            m.get("role"),
+            m.get("content") if m.get("role") in ("system", "user") else None,
+            [call["function"]["name"] for call in m.get("tool_calls") or []],
+        ]
+        for m in body.get("messages") or []
+    ]
+    tools = [tool["function"]["name"] for tool in body.get("tools") or []]
+    shape = [body.get("model"), bool(body.get("stream")), body.get("tool_choice"), tools, messages]
+    return exact_key(method, path, shape)
+
+
+class _Writer:
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def write(self, entry):
+        line = json.dumps(entry) + "\n"
+        with self._lock, open(self.path, "a") as f:
+            f.write(line)
+
+
+class _Recorder:
+    """Collect one response's chunks with their arrival times and write the entry when it is closed"""
+
+    def __init__(self, writer, request, response, start):
+        self.writer = writer
+        self.start = start
+        self.chunks = []
+        self.entry = {
+            "request": {"method": request.method, "path": request.url.path, "body": _body(request)},
+            "response": {
+                "status": response.status_code,
+                "headers": {k: v for k, v in response.headers.items() if k.lower() in KEEP_HEADERS},
+            },
+            "elapsed": time.perf_counter() - start,
+        }
+
+    def add(self, chunk):
+        self.chunks.append([time.perf_counter() - self.start, chunk.decode("utf-8", errors="replace")])
+        return chunk
+
+    def close(self):
+        if self.entry is not None:
+            self.entry["response"]["chunks"] = self.chunks
+            self.writer.write(self.entry)
+            self.entry = None
+
+
+class _RecordingStream(httpx.SyncByteStream):
+    def __init__(self, stream, recorder):
+        self._stream = stream
+        self._recorder = recorder
+
+    def __iter__(self):
+        for chunk in self._stream:
+            yield self._recorder.add(chunk)
+
+    def close(self):
+        self._stream.close()
+        self._recorder.close()
+
+
+class _AsyncRecordingStream(httpx.AsyncByteStream):
+    def __init__(self, stream, recorder):
+        self._stream = stream
+        self._recorder = recorder
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield self._recorder.add(chunk)
+
+    async def aclose(self):
+        await self._stream.aclose()
+        self._recorder.close()
+
+
+class RecordingTransport(httpx.BaseTransport):
+    """Pass requests to `transport` and append each exchange to the cassette"""
+
+    def __init__(self, transport, path=CASSETTE_PATH):
+        self._transport = transport
+        self._writer = _Writer(path)
+
+    def handle_request(self, request):
+        start = time.perf_counter()
+        response = self._transport.handle_request(request)
+        recorder = _Recorder(self._writer, request, response, start)
+        return httpx.Response(
+            response.status_code,
+            headers=response.headers,
+            stream=_RecordingStream(response.stream, recorder),
+            extensions=response.extensions,
+        )
+
+    def close(self):
+        self._transport.close()
+
+
+class AsyncRecordingTransport(httpx.AsyncBaseTransport):
+    def __init__(self, transport, path=CASSETTE_PATH):
+        self._transport = transport
+        self._writer = _Writer(path)
+
+    async def handle_async_request(self, request):
+        start = time.perf_counter()
+        response = await self._transport.handle_async_request(request)
+        recorder = _Recorder(self._writer, request, response, start)
+        return httpx.Response(
+            response.status_code,
+            headers=response.headers,
+            stream=_AsyncRecordingStream(response.stream, recorder),
+            extensions=response.extensions,
+        )
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+
+class Cassette:
+    """Recorded exchanges, served in recording order per request.
+
+    A request is matched on its exact body first and then on its shape:
+    model, tools, user and system messages and the names of the tools
+    called. The shape ignores tool results and assistant text, which
+    differ between runs when a local tool reports the current time. Once
+    every recording for a key has been served, the last one is repeated.
+    """
+
+    def __init__(self, path=CASSETTE_PATH):
+        self.path = path
+        self._exact = defaultdict(deque)
+        self._loose = defaultdict(deque)
+        self._lock = threading.Lock()
+        self.exact = 0
+        self.loose = 0
+        self.misses = 0
+        with open(path) as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    request = entry["request"]
+                    args = request["method"], request["path"], request["body"]
+                    self._exact[exact_key(*args)].append(entry)
+                    self._loose[loose_key(*args)].append(entry)
+
+    @staticmethod
+    def _take(entries):
+        return entries.popleft() if len(entries) > 1 else entries[0]
+
+    def find(self, request):
+        args = request.method, request.url.path, _body(request)
+        with self._lock:
+            entries = self._exact.get(exact_key(*args))
+            if entries:
+                self.exact += 1
+                return self._take(entries)
+            entries = self._loose.get(loose_key(*args))
+            if entries:
+                self.loose += 1
+                return self._take(entries)
+            self.misses += 1
+            return None
+
+    def stats(self):
+        return {"exact": self.exact, "loose": self.loose, "misses": self.misses}
+
+
+def _miss(path):
+    # 404 is not retried, so a miss fails fast instead of backing off
+    return 404, {"content-type": "application/json"}, [[0.0, json.dumps({
+        "error": {"message": f"No recorded response for this request in {path}", "type": "cassette_miss"}
+    })]]
+
+
+def _recorded(cassette, request):
+    entry = cassette.find(request)
+    if entry is None:
+        return (*_miss(cassette.path), 0.0)
+    response = entry["response"]
+    return response["status"], response["headers"], response["chunks"], entry["elapsed"]
+
+
+class _ReplayStream(httpx.SyncByteStream):
+    def __init__(self, chunks, latency):
+        self._chunks = chunks
+        self._latency = latency
+
+    def __iter__(self):
+        start = time.perf_counter()
+        for offset, text in self._chunks:
+            if self._latency:
+                time.sleep(max(0.0, offset - (time.perf_counter() - start)))
+            yield text.encode()
+
+
+class _AsyncReplayStream(httpx.AsyncByteStream):
+    def __init__(self, chunks, latency):
+        self._chunks = chunks
+        self._latency = latency
+
+    async def __aiter__(self):
+        import asyncio
+
+        start = time.perf_counter()
+        for offset, text in self._chunks:
+            if self._latency:
+                await asyncio.sleep(max(0.0, offset - (time.perf_counter() - start)))
+            yield text.encode()
+
+
+def _offsets(chunks, elapsed):
+    """Chunk times relative to the headers, which is when the stream starts being read"""
+    return [[max(0.0, offset - elapsed), text] for offset, text in chunks]
+
+
+class ReplayTransport(httpx.BaseTransport):
+    """Answer every request from a cassette; no network access is needed"""
+
+    def __init__(self, cassette, latency=CASSETTE_LATENCY):
+        self.cassette = cassette
+        self.latency = latency
+
+    def handle_request(self, request):
+        status, headers, chunks, elapsed = _recorded(self.cassette, request)
+        if self.latency:
+            time.sleep(elapsed)
+        return httpx.Response(status, headers=headers, stream=_ReplayStream(_offsets(chunks, elapsed), self.latency))
+
+
+class AsyncReplayTransport(httpx.AsyncBaseTransport):
+    def __init__(self, cassette, latency=CASSETTE_LATENCY):
+        self.cassette = cassette
+        self.latency = latency
+
+    async def handle_async_request(self, request):
+        import asyncio
+
+        status, headers, chunks, elapsed = _recorded(self.cassette, request)
+        if self.latency:
+            await asyncio.sleep(elapsed)
+        return httpx.Response(
+            status, headers=headers, stream=_AsyncReplayStream(_offsets(chunks, elapsed), self.latency)
+        )
+
+
+_cassette = None
+_cassette_lock = threading.Lock()
+
+
+def get_cassette():
+    """The cassette being replayed, loaded once and shared by the sync and async clients"""
+    global _cassette
+    with _cassette_lock:
+        if _cassette is None:
+            _cassette = Cassette(CASSETTE_PATH)
+        return _cassette
+
+
+def transport(limits):
+    """httpx transport for the sync client, or None for the default one"""
+    if CASSETTE_MODE == "record":
+        return RecordingTransport(httpx.HTTPTransport(limits=limits))
+    if CASSETTE_MODE == "replay":
+        return ReplayTransport(get_cassette())
+    return None
+
+
+def async_transport(limits):
+    if CASSETTE_MODE == "record":
+        return AsyncRecordingTransport(httpx.AsyncHTTPTransport(limits=limits))
+    if CASSETTE_MODE == "replay":
+        return AsyncReplayTransport(get_cassette())
+    return None
@@ -0,0 +1,210 @@
+import os
+import threading
+from functools import lru_cache
+
+from deadline import DeadlineExceeded, remaining
+from pool import get_pool
+from ratelimit import limiter
+from tracing import record_usage, span
+
+# Connection pool and timeout settings shared by every Groq client in the process
+MAX_CONNECTIONS = int(os.getenv("GROQ_MAX_CONNECTIONS", "100"))
+MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("GROQ_MAX_KEEPALIVE_CONNECTIONS", "20"))
+KEEPALIVE_EXPIRY = float(os.getenv("GROQ_KEEPALIVE_EXPIRY", "60"))
+TIMEOUT = float(os.getenv("GROQ_TIMEOUT", "60"))
+CONNECT_TIMEOUT = float(os.getenv("GROQ_CONNECT_TIMEOUT", "5"))
+# Upper bound on concurrent async Groq requests across every session in the process
+MAX_IN_FLIGHT = int(os.getenv("GROQ_MAX_IN_FLIGHT", "64"))
+
+
+def _limits():
+    import httpx
+
+    return httpx.Limits(
+        max_connections=MAX_CONNECTIONS,
+        max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=KEEPALIVE_EXPIRY,
+    )
+
+
+def _timeout():
+    import httpx
+
+    return httpx.Timeout(TIMEOUT, connect=CONNECT_TIMEOUT)
+
+
+def _api_key():
+    # A replayed cassette needs no credentials, but the SDK insists on a key
+    return os.getenv("GROQ_API_KEY") or ("replay" if os.getenv("CASSETTE_MODE") == "replay" else None)
+
+
+def _openai_path(request):
+    """Send the SDK's /openai/v1/... paths to an OpenAI-compatible server's base URL instead"""
+    request.url = request.url.copy_with(path=request.url.path.replace("/openai/v1/", "/", 1))
+
+
+async def _aopenai_path(request):
+    _openai_path(request)
+
+
+def build_client(api_key=None, base_url=None, openai_compatible=False):
+    """A Groq client with the shared connection, timeout and transport settings.
+
+    `base_url` defaults to GROQ_BASE_URL or the Groq API. With
+    `openai_compatible`, requests go to `<base_url>/chat/completions` as on
+    other OpenAI-compatible servers, rather than under `/openai/v1`.
+    """
+    import httpx
+    from groq import Groq
+
+    import cassette
+
+    return Groq(
+        api_key=api_key or _api_key(),
+        base_url=base_url,
+        timeout=_timeout(),
+        max_retries=0,  # retries are handled by the shared rate limiter
+        http_client=httpx.Client(
+            limits=_limits(),
+            timeout=_timeout(),
+            transport=cassette.transport(_limits()),
+            event_hooks={"request": [_openai_path]} if openai_compatible else None,
+        ),
+    )
+
+
+def build_async_client(api_key=None, base_url=None, openai_compatible=False):
+    import httpx
+    from groq import AsyncGroq
+
+    import cassette
+
+    return AsyncGroq(
+        api_key=api_key or _api_key(),
+        base_url=base_url,
+        timeout=_timeout(),
+        max_retries=0,
+        http_client=httpx.AsyncClient(
+            limits=_limits(),
+            timeout=_timeout(),
+            transport=cassette.async_transport(_limits()),
+            event_hooks={"request": [_aopenai_path]} if openai_compatible else None,
+        ),
+    )
+
+
+@lru_cache(maxsize=None)
+def get_client():
+    """Return the process-wide Groq client.
+
+    The client lives in this module rather than in a Streamlit script, so it is
+    built once per process and its pooled keep-alive connections are reused
+    across reruns, tool calls and threads. It is created, and groq imported,
+    on first use, which keeps importing the tool layer cheap.
+    """
+    return build_client()
+
+
+@lru_cache(maxsize=None)
+def get_async_client():
+    """Return the process-wide AsyncGroq client.
+
+    httpx async connections belong to the event loop that opened them, so use
+    this from a single long-running loop.
+    """
+    return build_async_client()
+
+
+def warm_up():
+    """Build the shared client on a background thread, so importing groq overlaps with other startup work"""
+    if get_client.cache_info().currsize == 0:
+        threading.Thread(target=get_client, daemon=True).start()
+
+
+def create_completion(client=None, **kwargs):
+    """Create a chat completion through the shared rate limiter, or the client pool when one is configured"""
+    pool = get_pool() if client is None else None
+    with span("llm.request", model=kwargs.get("model"), stream=bool(kwargs.get("stream"))):
+        if pool is not None:
+            response = pool.call(**kwargs)
+        else:
+            response = limiter.call((client or get_client()).chat.completions.create, **kwargs)
+        record_usage(getattr(response, "usage", None))
+        return response
+
+
+@lru_cache(maxsize=None)
+def llm_semaphore():
+    """Limit on in-flight async requests, created on first use so sync callers never import asyncio"""
+    import asyncio
+
+    return asyncio.Semaphore(MAX_IN_FLIGHT)
+
+
+class _SlotStream:
+    """A streamed response that keeps its in-flight slot until it is read to the end or closed"""
+
+    def __init__(self, stream, release):
+        self._stream = stream
+        self._release = release
+
+    def _done(self):
+        if self._release is not None:
+            self._release()
+            self._release = None
+
+    async def __aiter__(self):
+        try:
+            async for chunk in self._stream:
+                yield chunk
+        finally:
+            self._done()
+
+    async def close(self):
+        try:
+            await self._stream.close()
+        finally:
+            self._done()
+
+
+async def _in_flight(create, kwargs):
+    semaphore = llm_semaphore()
+    await semaphore.acquire()
+    try:
+        response = await create(**kwargs)
+    except BaseException:
+        semaphore.release()
+        raise
+    if kwargs.get("stream"):
+        return _SlotStream(response, semaphore.release)
+    semaphore.release()
+    return response
+
+
+async def _send(**kwargs):
+    return await _in_flight(get_async_client().chat.completions.create, kwargs)
+
+
+async def _send_pooled(**kwargs):
+    return await _in_flight(get_pool().acall, kwargs)
+
+
+async def acreate_completion(**kwargs):
+    """Async `create_completion`; also holds a slot of the in-flight limiter while sending.
+
+    A streamed response keeps its slot until it is read to the end or closed.
+    """
+    import asyncio
+
+    with span("llm.request", model=kwargs.get("model"), stream=bool(kwargs.get("stream"))):
+        try:
+            # Also bounds the wait for an in-flight slot, which the request timeout does not cover
+            if get_pool() is not None:
+                sending = _send_pooled(**kwargs)  # each member has its own rate limiter
+            else:
+                sending = limiter.acall(_send, **kwargs)
+            response = await asyncio.wait_for(sending, remaining())
+        except asyncio.TimeoutError:
+            raise DeadlineExceeded("Deadline exceeded waiting for the LLM")
+        record_usage(getattr(response, "usage", None))
+        return response
@@ -0,0 +1,185 @@
+import json
+import os
+import re
+
+from tracing import annotate
+
+# Input token budget for one agent completion, including the tools schema
+CONTEXT_BUDGET = int(os.getenv("AGENT_CONTEXT_BUDGET", "4000"))
+# Tool outputs longer than this are truncated before they are resent
+MAX_TOOL_OUTPUT_TOKENS = int(os.getenv("AGENT_MAX_TOOL_OUTPUT_TOKENS", "300"))
+# Per-message overhead of the chat format (role, separators)
+MESSAGE_OVERHEAD = 4
+# Characters kept per tool output when older steps are folded into a summary
+SUMMARY_CHARS = 200
+
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+
+
+def estimate_tokens(text):
+    """Fast local token estimate: one per word or symbol, plus one per 8 characters of long words"""
+    if not text:
+        return 0
+    return sum(1 + len(piece) // 8 for piece in _TOKEN_RE.findall(text))
+
+
+def as_dict(message):
+    """Plain dict form of a chat message, including SDK message objects"""
+    if isinstance(message, dict):
+        return message
+    result = {"role": message.role, "content": message.content}
+    if message.tool_calls:
+        result["tool_calls"] = [
+            {
+                "id": tool_call.id,
+                "type": "function",
+                "function": {"name": tool_call.function.name, "arguments": tool_call.function.arguments},
+            }
+            for tool_call in message.tool_calls
+        ]
+    return result
+
+
+def tool_trace(messages):
+    """Pair each tool call in the conversation with its output"""
+    messages = [as_dict(message) for message in messages]
+    outputs = {m["tool_call_id"]: m["content"] for m in messages if m["role"] == "tool"}
+    trace = []
+    for message in messages:
+        for tool_call in message.get("tool_calls") or []:
+            trace.append({
+                "name": tool_call["function"]["name"],
+                "arguments": tool_call["function"]["arguments"],
+                "output": outputs.get(tool_call["id"]),
+            })
+    return trace
+
+
+def message_tokens(message):
+    message = as_dict(message)
+    tokens = MESSAGE_OVERHEAD + estimate_tokens(message.get("content") or "")
+    for tool_call in message.get("tool_calls") or []:
+        tokens += estimate_tokens(tool_call["function"]["name"]) + estimate_tokens(tool_call["function"]["arguments"])
+    return tokens
+
+
+def truncate_text(text, max_tokens):
+    """Shorten text to about `max_tokens`; JSON objects keep their keys and stay valid"""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    try:
+        data = json.loads(text)
+    except (json.JSONDecodeError, TypeError):
+        data = None
+    if isinstance(data, dict) and data:
+        share = max(1, max_tokens // len(data))
+        return json.dumps({k: truncate_text(v, share) if isinstance(v, str) else v for k, v in data.items()})
+    chars = max_tokens * 4
+    return text[:chars] + f"... [truncated {len(text) - chars} chars]"
+
+
+def current_turn(messages):
+    """Messages from the latest user prompt on, leaving out earlier turns of a conversation"""
+    for i in range(len(messages) - 1, -1, -1):
+        if isinstance(messages[i], dict) and messages[i].get("role") == "user":
+            return messages[i:]
+    return messages
+
+
+def _steps(messages):
+    """Split messages after a user prompt into (assistant, tool results) steps"""
+    steps = []
+    for message in messages:
+        if message["role"] == "tool" and steps:
+            steps[-1][1].append(message)
+        else:
+            steps.append((message, []))
+    return steps
+
+
+def _turns(messages):
+    """Split earlier conversation into turns, each starting at a user prompt"""
+    turns = []
+    for message in messages:
+        if message["role"] == "user" or not turns:
+            turns.append([])
+        turns[-1].append(message)
+    return turns
+
+
+def _summarize(steps):
+    """Fold whole steps into one assistant note listing their calls and short results"""
+    lines = []
+    for assistant, results in steps:
+        outputs = {result["tool_call_id"]: result["content"] for result in results}
+        for tool_call in assistant.get("tool_calls") or []:
+            output = outputs.get(tool_call["id"], "")
+            lines.append(
+                f"- {tool_call['function']['name']}({tool_call['function']['arguments']}): {output[:SUMMARY_CHARS]}"
+            )
+        if not assistant.get("tool_calls") and assistant.get("content"):
+            lines.append(f"- {assistant['content'][:SUMMARY_CHARS]}")
+    return {"role": "assistant", "content": "Results of earlier tool calls:\n" + "\n".join(lines)}
+
+
+def compact_messages(messages, budget=CONTEXT_BUDGET, reserved=0):
+    """Return a copy of `messages` that fits `budget` input tokens.
+
+    `reserved` counts tokens sent outside the messages, such as the tools
+    schema. In order, until the budget is met:
+
+    1. Tool outputs are truncated to MAX_TOOL_OUTPUT_TOKENS.
+    2. Text that came with earlier tool calls is dropped, since the tool
+       results carry the information.
+    3. Earlier turns of the conversation are dropped, oldest first.
+    4. The oldest steps of the current turn are folded into a single
+       summary message. Its user prompt and latest step are always kept.
+
+    The original list is not modified.
+    """
+    messages = [dict(as_dict(message)) for message in messages]
+    for message in messages:
+        if message["role"] == "tool":
+            message["content"] = truncate_text(message["content"], MAX_TOOL_OUTPUT_TOKENS)
+
+    def fits(candidate):
+        return reserved + sum(message_tokens(message) for message in candidate) <= budget
+
+    if fits(messages):
+        return messages
+
+    for message in messages[:-1]:
+        if message["role"] == "assistant" and message.get("tool_calls"):
+            message["content"] = None
+    if fits(messages):
+        return messages
+
+    turn = current_turn(messages)
+    earlier = _turns(messages[:len(messages) - len(turn)])
+    for dropped in range(1, len(earlier) + 1):
+        candidate = [message for kept in earlier[dropped:] for message in kept] + turn
+        if fits(candidate):
+            return candidate
+
+    head, steps = turn[:1], _steps(turn[1:])
+    for folded in range(1, len(steps)):
+        candidate = head + [_summarize(steps[:folded])]
+        for assistant, results in steps[folded:]:
+            candidate += [assistant] + results
+        if fits(candidate):
+            return candidate
+    return candidate if len(steps) > 1 else turn
+
+
+def prepare_messages(messages, registry, tools=None):
+    """Compact `messages` for the next agent completion and note the result on the current span.
+
+    `tools` are the schemas sent with it when only some of the registry's are.
+    """
+    reserved = estimate_tokens(registry.schemas_json if tools is None else json.dumps(tools))
+    compacted = compact_messages(messages, reserved=reserved)
+    annotate(
+        context_tokens=reserved + sum(message_tokens(message) for message in compacted),
+        messages_dropped=len(messages) - len(compacted),
+    )
+    return compacted
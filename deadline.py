@@ -0,0 +1,107 @@
+import contextvars
+import json
+import os
+import time
+from contextlib import contextmanager
+
+from compaction import current_turn
+
+# Default total time limit in seconds for one agent run; 0 means none
+AGENT_TIMEOUT = float(os.getenv("AGENT_TIMEOUT", "0"))
+# Part of the time limit kept back for writing the final answer, at most a quarter of it
+FINAL_ANSWER_RESERVE = float(os.getenv("AGENT_FINAL_ANSWER_RESERVE", "2"))
+
+
+_deadline = contextvars.ContextVar("deadline", default=None)
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised instead of starting work that cannot finish before the deadline"""
+
+
+@contextmanager
+def deadline(seconds):
+    """Give the enclosed block `seconds` to finish; nested deadlines only ever shorten it.
+
+    `seconds=None` leaves the current deadline, if any, in place. The deadline
+    is carried in a context variable, so tool threads started with a copy of
+    the caller's context inherit it.
+    """
+    if seconds is None:
+        yield
+        return
+    at = time.monotonic() + seconds
+    outer = _deadline.get()
+    token = _deadline.set(at if outer is None else min(at, outer))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def step_time_limit(timeout):
+    """Time limit for an agent's steps: `timeout` minus what is kept for the final answer.
+
+    The reserve is at most a quarter of `timeout`, so short limits still leave
+    time for tool calls.
+    """
+    if timeout is None:
+        return None
+    return timeout - min(FINAL_ANSWER_RESERVE, timeout / 4)
+
+
+def remaining():
+    """Seconds left before the current deadline, or None without one"""
+    at = _deadline.get()
+    return None if at is None else max(0.0, at - time.monotonic())
+
+
+def fits(delay):
+    """Whether waiting `delay` seconds still leaves time before the deadline"""
+    left = remaining()
+    return left is None or delay < left
+
+
+def with_timeout(kwargs):
+    """Completion kwargs with `timeout` capped to the time left before the deadline"""
+    left = remaining()
+    if left is None:
+        return kwargs
+    if left == 0:
+        raise DeadlineExceeded("Deadline exceeded")
+    timeout = kwargs.get("timeout")
+    return {**kwargs, "timeout": left if timeout is None else min(timeout, left)}
+
+
+def timeout_errors():
+    """Exception types that mean a request ran out of time, for `except timeout_errors():`.
+
+    A function so that groq and httpx are only imported once an exception is
+    being handled, by which time a request has loaded them anyway.
+    """
+    import httpx
+    from groq import APITimeoutError
+
+    return (TimeoutError, APITimeoutError, httpx.TimeoutException)
+
+
+def timed_out_output(tool_call):
+    return json.dumps({"error": f"Tool {tool_call.function.name} did not finish before the deadline"})
+
+
+def partial_answer(messages):
+    """Final answer built locally from the tool results gathered before the deadline"""
+    results = []
+    for message in current_turn(messages):
+        if isinstance(message, dict) and message.get("role") == "tool":
+            try:
+                data = json.loads(message["content"])
+            except (json.JSONDecodeError, TypeError):
+                data = message["content"]
+            if not (isinstance(data, dict) and "error" in data):
+                results.append(message["content"])
+    if not results:
+        return "Sorry, I ran out of time before any tool results arrived."
+    return "I ran out of time before finishing. Here is what I found so far:\n" + "\n".join(
+        f"- {result}" for result in results
+    )
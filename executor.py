@@ -0,0 +1,110 @@
+import contextvars
+import json
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from deadline import remaining, timed_out_output
+from registry import ToolArgumentError
+from tracing import span
+
+MAX_TOOL_WORKERS = 8
+
+
+def parse_arguments(tool_call):
+    try:
+        return json.loads(tool_call.function.arguments or "{}")
+    except json.JSONDecodeError:
+        raise ToolArgumentError(f"Invalid JSON arguments for {tool_call.function.name}")
+
+
+def _tool_span(tool_call):
+    arguments = tool_call.function.arguments or ""
+    return span("tool", tool=tool_call.function.name, args_size=len(arguments))
+
+
+def call_tool(registry, tool_call):
+    """Run a single tool call and return its output as a string"""
+    tool_name = tool_call.function.name
+    with _tool_span(tool_call) as tool_span:
+        try:
+            return registry.call(tool_name, parse_arguments(tool_call))
+        except ToolArgumentError as e:
+            tool_span.set(error=str(e))
+            return json.dumps({"error": str(e)})
+        except Exception as e:
+            tool_span.set(error=str(e))
+            return json.dumps({"error": f"Tool {tool_name} failed: {str(e)}"})
+
+
+async def acall_tool(registry, tool_call):
+    """Async counterpart of `call_tool` for coroutine tool functions"""
+    tool_name = tool_call.function.name
+    with _tool_span(tool_call) as tool_span:
+        try:
+            return await registry.call(tool_name, parse_arguments(tool_call))
+        except ToolArgumentError as e:
+            tool_span.set(error=str(e))
+            return json.dumps({"error": str(e)})
+        except Exception as e:
+            tool_span.set(error=str(e))
+            return json.dumps({"error": f"Tool {tool_name} failed: {str(e)}"})
+
+
+async def _acall_tool_by_deadline(registry, tool_call):
+    import asyncio
+
+    try:
+        return await asyncio.wait_for(acall_tool(registry, tool_call), remaining())
+    except asyncio.TimeoutError:
+        return timed_out_output(tool_call)
+
+
+def tool_messages(tool_calls, outputs):
+    """Pair tool outputs with their calls as `role: tool` messages"""
+    return [
+        {
+            "role": "tool",
+            "tool_call_id": tool_call.id,
+            "content": output,
+        }
+        for tool_call, output in zip(tool_calls, outputs)
+    ]
+
+
+def run_tool_calls(tool_calls, registry, max_workers=MAX_TOOL_WORKERS):
+    """Run all tool calls of one assistant turn concurrently.
+
+    Returns the `role: tool` messages in the same order as `tool_calls`, so the
+    conversation stays valid regardless of which call finishes first. A failing
+    tool, or one still running at the deadline, only produces an error payload
+    for its own call.
+    """
+    if not tool_calls:
+        return []
+    workers = max(1, min(max_workers, len(tool_calls)))
+    pool = ThreadPoolExecutor(max_workers=workers)
+    # Each call runs in a copy of the caller's context so its spans join the
+    # current trace and its completions see the current deadline
+    futures = [
+        pool.submit(contextvars.copy_context().run, call_tool, registry, tool_call)
+        for tool_call in tool_calls
+    ]
+    done, _ = wait(futures, timeout=remaining())
+    # Stragglers past the deadline are not waited for
+    pool.shutdown(wait=False, cancel_futures=True)
+    outputs = [
+        future.result() if future in done else timed_out_output(tool_call)
+        for tool_call, future in zip(tool_calls, futures)
+    ]
+    return tool_messages(tool_calls, outputs)
+
+
+async def arun_tool_calls(tool_calls, registry):
+    """Run all tool calls of one assistant turn as concurrent tasks.
+
+    Concurrency is bounded by the in-flight limit of the async tool layer
+    rather than by a thread count.
+    """
+    import asyncio
+
+    outputs = await asyncio.gather(*(_acall_tool_by_deadline(registry, tool_call) for tool_call in tool_calls))
+    return tool_messages(tool_calls, outputs)
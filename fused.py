@@ -0,0 +1,140 @@
+import json
+import os
+
+from cache import tool_cache
+from client import acreate_completion, create_completion
+from executor import arun_tool_calls, parse_arguments, run_tool_calls, tool_messages
+from registry import ToolArgumentError
+from routing import MODEL, route
+from tools import TOOL_PROMPTS, build_request, is_local
+from tracing import span
+
+# Resolve the synthetic tool calls of an agent step with one completion
+FUSED_TOOL_CALLS = os.getenv("FUSED_TOOL_CALLS", "0") == "1"
+
+FUSED_PROMPT = """You answer several tool API requests at once. Each request below starts with its tool_call_id.
+Respond with a JSON object with a single key 'results': an array with one entry per request, each an object with keys 'tool_call_id' and 'result', where 'result' is the JSON object that tool API would return."""
+
+
+def plan(tool_calls, registry):
+    """Split a step's tool calls into those worth fusing and outputs already known.
+
+    Calls with invalid arguments, tools answered locally and cache hits are
+    left out of the fused request. Returns `(pending, outputs)` where
+    `pending` holds `(tool_call, args)` pairs and `outputs` maps tool call ids
+    to cached results. Fusing needs at least two pending calls. No tool runs
+    here, and a cache miss is counted by whichever path answers the call.
+    """
+    pending, outputs = [], {}
+    for tool_call in tool_calls:
+        name = tool_call.function.name
+        if name not in TOOL_PROMPTS:
+            continue
+        try:
+            args = parse_arguments(tool_call)
+            registry.validate(name, args)
+        except ToolArgumentError:
+            continue
+        if is_local(name):
+            continue
+        cached = tool_cache.peek(name, args, build_request(name, args))
+        if cached is not None:
+            tool_cache.count(name, hit=True)
+            outputs[tool_call.id] = cached
+        else:
+            pending.append((tool_call, args))
+    if len(pending) < 2:
+        return [], outputs
+    return pending, outputs
+
+
+def build_fused_request(pending):
+    """One JSON-mode completion covering every pending synthetic tool call"""
+    specs = [TOOL_PROMPTS[tool_call.function.name] for tool_call, _ in pending]
+    requests = "\n".join(
+        f"- tool_call_id {tool_call.id}: " + " ".join(spec["prompt"].format(**args).split())
+        for (tool_call, args), spec in zip(pending, specs)
+    )
+    settings = route("tools", "fused", {
+        "model": MODEL,
+        "temperature": max(spec["temperature"] for spec in specs),
+        "max_tokens": sum(spec["max_tokens"] + 20 for spec in specs),
+    })
+    return {
+        "messages": [
+            {"role": "system", "content": FUSED_PROMPT},
+            {"role": "user", "content": requests},
+        ],
+        "response_format": {"type": "json_object"},
+        **settings,
+    }
+
+
+def split_results(content, pending):
+    """Map tool call ids to JSON result strings; unusable entries are left out"""
+    try:
+        data = json.loads(content)
+    except (json.JSONDecodeError, TypeError):
+        return {}
+    results = data.get("results") if isinstance(data, dict) else None
+    if not isinstance(results, list):
+        return {}
+    ids = {tool_call.id for tool_call, _ in pending}
+    outputs = {}
+    for item in results:
+        if isinstance(item, dict) and item.get("tool_call_id") in ids and isinstance(item.get("result"), dict):
+            outputs[item["tool_call_id"]] = json.dumps(item["result"])
+    return outputs
+
+
+def _store(pending, outputs):
+    for tool_call, args in pending:
+        if tool_call.id in outputs:
+            name = tool_call.function.name
+            tool_cache.count(name, hit=False)
+            tool_cache.set(name, args, build_request(name, args), outputs[tool_call.id])
+
+
+def _merge(tool_calls, outputs, messages):
+    outputs.update({message["tool_call_id"]: message["content"] for message in messages})
+    return tool_messages(tool_calls, [outputs[tool_call.id] for tool_call in tool_calls])
+
+
+def run_fused_tool_calls(tool_calls, registry):
+    """Like `executor.run_tool_calls`, but with the synthetic calls fused into one request.
+
+    Calls missing from the fused response, or all of them if it cannot be
+    parsed, fall back to running one by one.
+    """
+    pending, outputs = plan(tool_calls, registry)
+    if pending:
+        with span("tool.fused", tools=len(pending)) as fused_span:
+            try:
+                response = create_completion(**build_fused_request(pending))
+                fused = split_results(response.choices[0].message.content, pending)
+            except Exception as e:
+                fused_span.set(error=str(e))
+                fused = {}
+            _store(pending, fused)
+            outputs.update(fused)
+            fused_span.set(fused=len(fused), fallbacks=len(pending) - len(fused))
+    rest = [tool_call for tool_call in tool_calls if tool_call.id not in outputs]
+    return _merge(tool_calls, outputs, run_tool_calls(rest, registry))
+
+
+async def arun_fused_tool_calls(tool_calls, registry):
+    """Async counterpart of `run_fused_tool_calls`"""
+    pending, outputs = plan(tool_calls, registry)
+    if pending:
+        with span("tool.fused", tools=len(pending)) as fused_span:
+            try:
+                response = await acreate_completion(**build_fused_request(pending))
+                fused = split_results(response.choices[0].message.content, pending)
+            except Exception as e:
+                fused_span.set(error=str(e))
+                fused = {}
+            _store(pending, fused)
+            outputs.update(fused)
+            fused_span.set(fused=len(fused), fallbacks=len(pending) - len(fused))
+    rest = [tool_call for tool_call in tool_calls if tool_call.id not in outputs]
+    return _merge(tool_calls, outputs, await arun_tool_calls(rest, registry))
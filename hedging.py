@@ -0,0 +1,170 @@
+import contextvars
+import math
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from tracing import annotate
+
+# "tools" hedges the synthetic tool completions, "all" also the agent's
+# non-streaming completions; anything else turns hedging off
+HEDGE_REQUESTS = os.getenv("HEDGE_REQUESTS", "off")
+# Send a duplicate once a request has run longer than this percentile of recent latencies
+HEDGE_PERCENTILE = float(os.getenv("HEDGE_PERCENTILE", "95"))
+# Extra requests allowed, as a fraction of all hedgeable requests
+HEDGE_MAX_EXTRA = float(os.getenv("HEDGE_MAX_EXTRA", "0.05"))
+# Latencies kept per key, and how many are needed before hedging starts
+HEDGE_WINDOW = int(os.getenv("HEDGE_WINDOW", "200"))
+HEDGE_MIN_SAMPLES = int(os.getenv("HEDGE_MIN_SAMPLES", "20"))
+
+BUDGET_BURST = 5  # hedges that may fire back to back once the budget has built up
+
+# Sync attempts run here while the caller waits; sized for every tool call of many concurrent agents
+_pool = ThreadPoolExecutor(max_workers=128, thread_name_prefix="hedge")
+
+
+class Hedger:
+    """Hedged requests: after a delay, race a duplicate and keep the first answer.
+
+    The delay is a percentile of the latest `window` latencies observed for
+    the same key (a tool name, or "agent"), so only requests slower than
+    usual are duplicated. Every request adds `max_extra` to a budget that
+    each hedge spends one from, which caps the extra load. The losing
+    request is cancelled where possible: async tasks are, but a thread
+    already sending a sync request runs to completion and its answer is
+    dropped.
+    """
+
+    def __init__(self, mode=HEDGE_REQUESTS, percentile=HEDGE_PERCENTILE, max_extra=HEDGE_MAX_EXTRA,
+                 window=HEDGE_WINDOW, min_samples=HEDGE_MIN_SAMPLES):
+        self.mode = mode
+        self.percentile = percentile
+        self.max_extra = max_extra
+        self.min_samples = min_samples
+        self._latencies = defaultdict(lambda: deque(maxlen=window))
+        self._budget = 0.0
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.fired = 0
+        self.won = 0
+        self.over_budget = 0
+
+    def enabled(self, key):
+        return key is not None and (self.mode == "all" or self.mode == "tools" and key != "agent")
+
+    def delay(self, key):
+        """Seconds to wait before hedging a request for `key`, or None while too few latencies are known"""
+        with self._lock:
+            latencies = sorted(self._latencies[key])
+        if len(latencies) < self.min_samples:
+            return None
+        return latencies[max(0, math.ceil(self.percentile / 100 * len(latencies)) - 1)]
+
+    def _start(self):
+        with self._lock:
+            self.requests += 1
+            self._budget = min(BUDGET_BURST, self._budget + self.max_extra)
+
+    def _spend(self):
+        with self._lock:
+            if self._budget < 1:
+                self.over_budget += 1
+                return False
+            self._budget -= 1
+            self.fired += 1
+            return True
+
+    def _record(self, key, start):
+        with self._lock:
+            self._latencies[key].append(time.perf_counter() - start)
+
+    def _timed(self, key, fn, args, kwargs):
+        start = time.perf_counter()
+        result = fn(*args, **kwargs)
+        self._record(key, start)
+        return result
+
+    async def _atimed(self, key, fn, args, kwargs):
+        start = time.perf_counter()
+        result = await fn(*args, **kwargs)
+        self._record(key, start)
+        return result
+
+    def _won(self, hedged):
+        annotate(hedged=True, hedge_won=hedged)
+        if hedged:
+            with self._lock:
+                self.won += 1
+
+    def call(self, key, fn, *args, **kwargs):
+        """`fn(*args, **kwargs)`, hedged when enabled for `key`"""
+        if not self.enabled(key):
+            return fn(*args, **kwargs)
+        self._start()
+        delay = self.delay(key)
+        if delay is None:
+            return self._timed(key, fn, args, kwargs)
+        # Each attempt runs in a copy of the caller's context, for its spans and deadline
+        primary = _pool.submit(contextvars.copy_context().run, self._timed, key, fn, args, kwargs)
+        done, _ = wait([primary], timeout=delay)
+        if done or not self._spend():
+            return primary.result()
+        hedge = _pool.submit(contextvars.copy_context().run, self._timed, key, fn, args, kwargs)
+        pending = {primary, hedge}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    for loser in pending:
+                        loser.cancel()
+                    self._won(future is hedge)
+                    return future.result()
+        annotate(hedged=True)
+        return primary.result()  # both failed
+
+    async def acall(self, key, fn, *args, **kwargs):
+        """Async `call` for coroutine functions; the losing task is cancelled"""
+        import asyncio
+
+        if not self.enabled(key):
+            return await fn(*args, **kwargs)
+        self._start()
+        delay = self.delay(key)
+        if delay is None:
+            return await self._atimed(key, fn, args, kwargs)
+        primary = asyncio.ensure_future(self._atimed(key, fn, args, kwargs))
+        tasks = [primary]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if done or not self._spend():
+                return await primary
+            hedge = asyncio.ensure_future(self._atimed(key, fn, args, kwargs))
+            tasks.append(hedge)
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        self._won(task is hedge)
+                        return task.result()
+            annotate(hedged=True)
+            return primary.result()  # both failed
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "fired": self.fired,
+                "won": self.won,
+                "over_budget": self.over_budget,
+                "fire_rate": self.fired / self.requests if self.requests else 0.0,
+                "win_rate": self.won / self.fired if self.fired else 0.0,
+            }
+
+
+hedger = Hedger()
@@ -0,0 +1,264 @@
+import json
+import os
+from datetime import datetime, timezone
+from decimal import Decimal, InvalidOperation
+from importlib import resources
+from zoneinfo import TZPATH, ZoneInfo, ZoneInfoNotFoundError, available_timezones
+
+# Common locations that are not the name of an IANA zone city
+LOCATION_TIMEZONES = {
+    "san francisco": "America/Los_Angeles",
+    "seattle": "America/Los_Angeles",
+    "boston": "America/New_York",
+    "washington": "America/New_York",
+    "miami": "America/New_York",
+    "atlanta": "America/New_York",
+    "dallas": "America/Chicago",
+    "houston": "America/Chicago",
+    "austin": "America/Chicago",
+    "san diego": "America/Los_Angeles",
+    "las vegas": "America/Los_Angeles",
+    "montreal": "America/Toronto",
+    "chennai": "Asia/Kolkata",
+    "mumbai": "Asia/Kolkata",
+    "delhi": "Asia/Kolkata",
+    "new delhi": "Asia/Kolkata",
+    "bangalore": "Asia/Kolkata",
+    "bengaluru": "Asia/Kolkata",
+    "hyderabad": "Asia/Kolkata",
+    "india": "Asia/Kolkata",
+    "beijing": "Asia/Shanghai",
+    "china": "Asia/Shanghai",
+    "japan": "Asia/Tokyo",
+    "osaka": "Asia/Tokyo",
+    "kyoto": "Asia/Tokyo",
+    "uk": "Europe/London",
+    "england": "Europe/London",
+    "france": "Europe/Paris",
+    "germany": "Europe/Berlin",
+    "munich": "Europe/Berlin",
+    "italy": "Europe/Rome",
+    "milan": "Europe/Rome",
+    "spain": "Europe/Madrid",
+    "barcelona": "Europe/Madrid",
+    "geneva": "Europe/Zurich",
+    "abu dhabi": "Asia/Dubai",
+    "uae": "Asia/Dubai",
+    "hong kong": "Asia/Hong_Kong",
+    "ho chi minh city": "Asia/Ho_Chi_Minh",
+    "canberra": "Australia/Sydney",
+    "wellington": "Pacific/Auckland",
+    "rio de janeiro": "America/Sao_Paulo",
+}
+
+
+# Zones of US states, Canadian provinces and Australian states, by code and name, for
+# qualifiers such as "Seattle, WA"; states spanning several zones list one per UTC offset
+REGION_TIMEZONES = {
+    ("al", "alabama"): ("America/Chicago",),
+    ("ak", "alaska"): ("America/Anchorage", "America/Adak"),
+    ("az", "arizona"): ("America/Phoenix", "America/Denver"),
+    ("ar", "arkansas"): ("America/Chicago",),
+    ("ca", "california"): ("America/Los_Angeles",),
+    ("co", "colorado"): ("America/Denver",),
+    ("ct", "connecticut"): ("America/New_York",),
+    ("de", "delaware"): ("America/New_York",),
+    ("dc", "district of columbia"): ("America/New_York",),
+    ("fl", "florida"): ("America/New_York", "America/Chicago"),
+    ("ga", "georgia"): ("America/New_York",),
+    ("hi", "hawaii"): ("Pacific/Honolulu",),
+    ("id", "idaho"): ("America/Boise", "America/Los_Angeles"),
+    ("il", "illinois"): ("America/Chicago",),
+    ("in", "indiana"): ("America/Indiana/Indianapolis", "America/Chicago"),
+    ("ia", "iowa"): ("America/Chicago",),
+    ("ks", "kansas"): ("America/Chicago", "America/Denver"),
+    ("ky", "kentucky"): ("America/New_York", "America/Chicago"),
+    ("la", "louisiana"): ("America/Chicago",),
+    ("me", "maine"): ("America/New_York",),
+    ("md", "maryland"): ("America/New_York",),
+    ("ma", "massachusetts"): ("America/New_York",),
+    ("mi", "michigan"): ("America/Detroit", "America/Menominee"),
+    ("mn", "minnesota"): ("America/Chicago",),
+    ("ms", "mississippi"): ("America/Chicago",),
+    ("mo", "missouri"): ("America/Chicago",),
+    ("mt", "montana"): ("America/Denver",),
+    ("ne", "nebraska"): ("America/Chicago", "America/Denver"),
+    ("nv", "nevada"): ("America/Los_Angeles", "America/Denver"),
+    ("nh", "new hampshire"): ("America/New_York",),
+    ("nj", "new jersey"): ("America/New_York",),
+    ("nm", "new mexico"): ("America/Denver",),
+    ("ny", "new york"): ("America/New_York",),
+    ("nc", "north carolina"): ("America/New_York",),
+    ("nd", "north dakota"): ("America/Chicago", "America/Denver"),
+    ("oh", "ohio"): ("America/New_York",),
+    ("ok", "oklahoma"): ("America/Chicago",),
+    ("or", "oregon"): ("America/Los_Angeles", "America/Boise"),
+    ("pa", "pennsylvania"): ("America/New_York",),
+    ("ri", "rhode island"): ("America/New_York",),
+    ("sc", "south carolina"): ("America/New_York",),
+    ("sd", "south dakota"): ("America/Chicago", "America/Denver"),
+    ("tn", "tennessee"): ("America/New_York", "America/Chicago"),
+    ("tx", "texas"): ("America/Chicago", "America/Denver"),
+    ("ut", "utah"): ("America/Denver",),
+    ("vt", "vermont"): ("America/New_York",),
+    ("va", "virginia"): ("America/New_York",),
+    ("wa", "washington"): ("America/Los_Angeles",),
+    ("wv", "west virginia"): ("America/New_York",),
+    ("wi", "wisconsin"): ("America/Chicago",),
+    ("wy", "wyoming"): ("America/Denver",),
+    ("ab", "alberta"): ("America/Edmonton",),
+    ("bc", "british columbia"): ("America/Vancouver", "America/Edmonton"),
+    ("mb", "manitoba"): ("America/Winnipeg",),
+    ("nb", "new brunswick"): ("America/Moncton",),
+    ("nl", "newfoundland"): ("America/St_Johns", "America/Goose_Bay"),
+    ("ns", "nova scotia"): ("America/Halifax",),
+    ("nt", "northwest territories"): ("America/Edmonton",),
+    ("nu", "nunavut"): ("America/Iqaluit", "America/Rankin_Inlet", "America/Cambridge_Bay"),
+    ("on", "ontario"): ("America/Toronto", "America/Winnipeg"),
+    ("pe", "prince edward island"): ("America/Halifax",),
+    ("qc", "quebec"): ("America/Toronto", "America/Halifax"),
+    ("sk", "saskatchewan"): ("America/Regina",),
+    ("yt", "yukon"): ("America/Whitehorse",),
+    ("act", "australian capital territory"): ("Australia/Sydney",),
+    ("nsw", "new south wales"): ("Australia/Sydney", "Australia/Broken_Hill"),
+    ("nt", "northern territory"): ("Australia/Darwin",),
+    ("qld", "queensland"): ("Australia/Brisbane",),
+    ("sa", "south australia"): ("Australia/Adelaide",),
+    ("tas", "tasmania"): ("Australia/Hobart",),
+    ("vic", "victoria"): ("Australia/Melbourne",),
+    ("wa", "western australia"): ("Australia/Perth",),
+}
+
+# Country names people write that differ from the tz database's iso3166.tab, by country code
+COUNTRY_ALIASES = {
+    "usa": "us", "u.s.": "us", "u.s.a.": "us", "united states of america": "us", "america": "us",
+    "uk": "gb", "u.k.": "gb", "united kingdom": "gb", "great britain": "gb",
+    "england": "gb", "scotland": "gb", "wales": "gb", "northern ireland": "gb",
+    "south korea": "kr", "north korea": "kp", "uae": "ae", "czechia": "cz", "burma": "mm",
+}
+
+
+def _tzdata_table(name):
+    """Rows of a tab-separated table shipped with the tz database, such as zone.tab"""
+    for directory in TZPATH:
+        path = os.path.join(directory, name)
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                text = f.read()
+            break
+    else:
+        try:
+            text = resources.files("tzdata.zoneinfo").joinpath(name).read_text(encoding="utf-8")
+        except (ModuleNotFoundError, FileNotFoundError):
+            return []
+    return [line.split("\t") for line in text.splitlines() if line and not line.startswith("#")]
+
+
+def _country_zones():
+    """Map lowercase country names and COUNTRY_ALIASES to the zones of that country.
+
+    Two-letter country codes are left out, since most are also state codes
+    ("IL", "IN", "DE").
+    """
+    zones = {}
+    for row in _tzdata_table("zone.tab"):
+        zones.setdefault(row[0].lower(), []).append(row[2].strip())
+    countries = {}
+    for code, name in _tzdata_table("iso3166.tab"):
+        if code.lower() in zones:
+            countries[name.split(" (")[0].strip().lower()] = zones[code.lower()]
+    for alias, code in COUNTRY_ALIASES.items():
+        countries[alias] = zones.get(code, [])
+    return countries
+
+
+def _qualifier_index():
+    """Map lowercase qualifiers (countries, states and state codes) to every zone they may mean"""
+    index = {name: set(zones) for name, zones in _country_zones().items()}
+    for names, zones in REGION_TIMEZONES.items():
+        for name in names:
+            index.setdefault(name, set()).update(zones)
+    return index
+
+
+def _zone_index():
+    """Map IANA zone names and lowercase cities of canonical zones (e.g. 'new york') to zones.
+
+    Only Region/City zones listed in zone.tab give cities. Links such as
+    US/Eastern, Brazil/West or Australia/Victoria name a zone after something
+    other than a city, so they must not be matched as one.
+    """
+    index = {zone: zone for zone in available_timezones()}
+    for row in _tzdata_table("zone.tab"):
+        zone = row[2].strip()
+        index.setdefault(zone.rsplit("/", 1)[-1].replace("_", " ").lower(), zone)
+    return index
+
+
+def _utc_offset(zone, now):
+    return now.astimezone(ZoneInfo(zone)).utcoffset()
+
+
+_zones = None
+_qualifiers = None
+
+
+def lookup_timezone(location):
+    """Resolve a free-form location to an IANA zone name, or None if unknown.
+
+    A qualifier such as the "TX" of "Paris, TX" must show the same time as the
+    zone of the city, or the city is taken to be another one of that name.
+    Qualifiers that are not known countries or states are ignored, and an
+    unknown city resolves to its qualifier's zone when that has a single
+    current UTC offset.
+    """
+    global _zones, _qualifiers
+    if _zones is None:
+        # scanning the tz database is slow, so do it once
+        _zones, _qualifiers = _zone_index(), _qualifier_index()
+    if location in _zones:
+        return _zones[location]
+    parts = [part.strip().lower() for part in str(location).split(",")]
+    if ", ".join(parts) in LOCATION_TIMEZONES:
+        return LOCATION_TIMEZONES[", ".join(parts)]
+    zone = LOCATION_TIMEZONES.get(parts[0]) or _zones.get(parts[0])
+    now = datetime.now(timezone.utc)
+    for qualifier in parts[1:]:
+        zones = _qualifiers.get(qualifier)
+        if not zones:
+            continue
+        offsets = {_utc_offset(other, now) for other in zones}
+        if zone is None and len(offsets) == 1:
+            zone = min(zones)
+        elif zone is not None and _utc_offset(zone, now) not in offsets:
+            return None
+    return zone
+
+
+def calculate_sum(a, b):
+    """Calculate the sum of two numbers with exact decimal arithmetic"""
+    try:
+        total = Decimal(str(a)) + Decimal(str(b))
+    except InvalidOperation:
+        raise ValueError(f"cannot add {a!r} and {b!r}")
+    total = int(total) if total == total.to_integral_value() else float(total)
+    return json.dumps({"a": a, "b": b, "sum": total})
+
+
+def get_time(location):
+    """Get the current time in a known location, or None to defer to the LLM"""
+    zone = lookup_timezone(location)
+    if zone is None:
+        return None
+    try:
+        now = datetime.now(ZoneInfo(zone))
+    except ZoneInfoNotFoundError:
+        return None
+    return json.dumps({"location": location, "time": now.strftime("%I:%M %p").lstrip("0")})
+
+
+# Tools that can be answered without an LLM round trip
+LOCAL_TOOLS = {
+    "calculate_sum": calculate_sum,
+    "get_time": get_time,
+}
@@ -1,5 +1,32 @@
+import argparse
+
+
 def main():
-    print("Hello from function-call-llm!")
+    parser = argparse.ArgumentParser(description="Function calling with LLM tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    batch = commands.add_parser("batch", help="Run a JSONL file of prompts through the agent")
+    batch.add_argument("input", help="JSONL file with one prompt per line")
+    batch.add_argument("output", help="JSONL file for results; also used to resume")
+    batch.add_argument("-w", "--workers", type=int, default=4, help="Concurrent prompts (default 4)")
+
+    serve = commands.add_parser("serve", help="Serve the agent over HTTP (JSON and Server-Sent Events)")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8000)
+    serve.add_argument("-w", "--workers", type=int, default=1, help="Worker processes (default 1)")
+
+    args = parser.parse_args()
+    from dotenv import load_dotenv
+
+    load_dotenv()  # before the project modules read their settings
+    if args.command == "batch":
+        from batch import run_batch
+
+        run_batch(args.input, args.output, workers=args.workers)
+    elif args.command == "serve":
+        from server import serve
+
+        serve(args.host, args.port, workers=args.workers)
 
 
 if __name__ == "__main__":
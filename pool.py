@@ -0,0 +1,265 @@
+"""Spread LLM requests over several API keys and endpoints.
+
+Configure the members with GROQ_API_KEYS (comma-separated keys for the
+default endpoint) or GROQ_POOL, a JSON list of members such as
+
+    [{"api_key": "gsk_a"}, {"api_key": "gsk_b", "weight": 2},
+     {"name": "local", "api_key": "none", "base_url": "http://localhost:8000/v1",
+      "openai_compatible": true, "model": "llama3", "requests_per_minute": 0}]
+
+Each member has its own client and rate limiter, so throughput grows with
+the number of keys.
+"""
+
+import json
+import math
+import os
+import random
+import threading
+import time
+from collections import deque
+from functools import lru_cache
+
+from deadline import fits
+from ratelimit import (
+    BASE_DELAY, MAX_DELAY, MAX_RETRIES, RETRY_BUDGET, RETRY_RATIO, RateLimiter, is_retryable, retry_after,
+)
+from tracing import annotate, current_span
+
+# "least-in-flight" or "round-robin" (weighted)
+POOL_STRATEGY = os.getenv("GROQ_POOL_STRATEGY", "least-in-flight")
+# A member is ejected for GROQ_POOL_EJECT_SECONDS once this share of its recent requests failed
+EJECT_ERROR_RATE = float(os.getenv("GROQ_POOL_EJECT_ERROR_RATE", "0.5"))
+EJECT_SECONDS = float(os.getenv("GROQ_POOL_EJECT_SECONDS", "30"))
+# Outcomes and latencies kept per member for health tracking
+HEALTH_WINDOW = int(os.getenv("GROQ_POOL_WINDOW", "20"))
+MIN_REQUESTS = 5  # outcomes needed before a member can be ejected
+
+if POOL_STRATEGY not in ("least-in-flight", "round-robin"):
+    raise ValueError(f"Unknown GROQ_POOL_STRATEGY {POOL_STRATEGY!r}; use least-in-flight or round-robin")
+
+
+def _unhealthy(error):
+    """Errors that say something about the endpoint: connection failures, timeouts and 5xx"""
+    if getattr(error, "status_code", None) == 429:
+        return False  # rate limited, not broken; the retry-after steers traffic away
+    return is_retryable(error)
+
+
+class Member:
+    """One key and endpoint, with its own clients, rate limiter and health window"""
+
+    def __init__(self, name, api_key=None, base_url=None, weight=1, openai_compatible=False, model=None,
+                 requests_per_minute=None, tokens_per_minute=None):
+        self.name = name
+        self.api_key = api_key
+        self.base_url = base_url
+        self.weight = weight
+        self.openai_compatible = openai_compatible
+        self.model = model
+        limits = {}
+        if requests_per_minute is not None:
+            limits["requests_per_minute"] = requests_per_minute
+        if tokens_per_minute is not None:
+            limits["tokens_per_minute"] = tokens_per_minute
+        self.limiter = RateLimiter(max_retries=0, **limits)  # the pool retries, on another member if it can
+        self.in_flight = 0
+        self.requests = 0
+        self.errors = 0
+        self.ejections = 0
+        self.ejected_until = 0.0
+        self.current_weight = 0.0
+        self.outcomes = deque(maxlen=HEALTH_WINDOW)
+        self.latencies = deque(maxlen=HEALTH_WINDOW)
+        self._client = None
+        self._async_client = None
+
+    def client(self):
+        if self._client is None:
+            from client import build_client
+
+            self._client = build_client(self.api_key, self.base_url, self.openai_compatible)
+        return self._client
+
+    def async_client(self):
+        if self._async_client is None:
+            from client import build_async_client
+
+            self._async_client = build_async_client(self.api_key, self.base_url, self.openai_compatible)
+        return self._async_client
+
+    def request(self, kwargs):
+        return {**kwargs, "model": self.model} if self.model else kwargs
+
+    def ejected(self, now):
+        return self.ejected_until > now
+
+    def error_rate(self):
+        return sum(not ok for ok in self.outcomes) / len(self.outcomes) if self.outcomes else 0.0
+
+    def stats(self, now):
+        latencies = sorted(self.latencies)
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "in_flight": self.in_flight,
+            "error_rate": self.error_rate(),
+            "p50": latencies[len(latencies) // 2] if latencies else None,
+            "p95": latencies[max(0, math.ceil(0.95 * len(latencies)) - 1)] if latencies else None,
+            "ejected": self.ejected(now),
+            "ejections": self.ejections,
+            **self.limiter.stats(),
+        }
+
+
+class ClientPool:
+    """Balance completions over members and fail over between them.
+
+    Members are picked by least in-flight requests relative to their weight,
+    or by smooth weighted round-robin. A member whose recent requests mostly
+    failed with connection errors, timeouts or 5xx is ejected for
+    `eject_seconds` and then given traffic again. Members blocked by a
+    retry-after are avoided while others are free. A retryable error is
+    retried on a different member, with backoff once every member has failed.
+    """
+
+    def __init__(self, members, strategy=POOL_STRATEGY, eject_error_rate=EJECT_ERROR_RATE,
+                 eject_seconds=EJECT_SECONDS, max_retries=MAX_RETRIES):
+        if not members:
+            raise ValueError("A client pool needs at least one member")
+        self.members = members
+        self.strategy = strategy
+        self.eject_error_rate = eject_error_rate
+        self.eject_seconds = eject_seconds
+        self.max_retries = max_retries
+        self.retry_budget = RETRY_BUDGET
+        self._lock = threading.Lock()
+
+    def pick(self, exclude=()):
+        """The member for the next request; never fails, even when every member is ejected"""
+        now = time.monotonic()
+        with self._lock:
+            candidates = [m for m in self.members if m not in exclude] or self.members
+            healthy = [m for m in candidates if not m.ejected(now)]
+            if not healthy:
+                member = min(candidates, key=lambda m: m.ejected_until)  # the soonest to return
+            else:
+                free = [m for m in healthy if m.limiter.blocked_until <= now] or healthy
+                if self.strategy == "round-robin":
+                    member = self._round_robin(free)
+                else:
+                    member = min(free, key=lambda m: ((m.in_flight + 1) / m.weight, random.random()))
+            member.in_flight += 1
+            member.requests += 1
+            self.retry_budget = min(self.retry_budget + RETRY_RATIO, RETRY_BUDGET)
+            return member
+
+    @staticmethod
+    def _round_robin(members):
+        total = sum(m.weight for m in members)
+        for m in members:
+            m.current_weight += m.weight
+        member = max(members, key=lambda m: m.current_weight)
+        member.current_weight -= total
+        return member
+
+    def _done(self, member, start, error=None):
+        now = time.monotonic()
+        with self._lock:
+            member.in_flight -= 1
+            if error is None:
+                member.outcomes.append(True)
+                member.latencies.append(now - start)
+                return
+            member.errors += 1
+            if not _unhealthy(error):
+                return
+            member.outcomes.append(False)
+            if len(member.outcomes) >= MIN_REQUESTS and member.error_rate() >= self.eject_error_rate:
+                member.ejected_until = now + self.eject_seconds
+                member.ejections += 1
+                member.outcomes.clear()  # start afresh once it is back
+
+    def _retry_delay(self, member, error, attempt, tried):
+        """Seconds to wait before retrying on another member, or None if the error should propagate"""
+        if attempt >= self.max_retries or not is_retryable(error):
+            return None
+        with self._lock:
+            if self.retry_budget < 1:
+                return None
+            self.retry_budget -= 1
+        current_span().add("retries")
+        delay = retry_after(error)
+        if delay is not None:
+            member.limiter.blocked_until = max(member.limiter.blocked_until, time.monotonic() + delay)
+        if len(tried) < len(self.members):
+            return 0.0  # another member is still untried
+        tried.clear()
+        return delay if delay is not None else random.uniform(0, min(MAX_DELAY, BASE_DELAY * 2 ** attempt))
+
+    def call(self, **kwargs):
+        tried = set()
+        for attempt in range(self.max_retries + 1):
+            member = self.pick(tried)
+            tried.add(member)
+            annotate(endpoint=member.name)
+            start = time.monotonic()
+            try:
+                response = member.limiter.call(member.client().chat.completions.create, **member.request(kwargs))
+            except Exception as e:
+                self._done(member, start, e)
+                delay = self._retry_delay(member, e, attempt, tried)
+                if delay is None or not fits(delay):
+                    raise
+                time.sleep(delay)
+                continue
+            self._done(member, start)
+            return response
+
+    async def acall(self, **kwargs):
+        import asyncio
+
+        tried = set()
+        for attempt in range(self.max_retries + 1):
+            member = self.pick(tried)
+            tried.add(member)
+            annotate(endpoint=member.name)
+            start = time.monotonic()
+            try:
+                response = await member.limiter.acall(
+                    member.async_client().chat.completions.create, **member.request(kwargs)
+                )
+            except asyncio.CancelledError:
+                with self._lock:
+                    member.in_flight -= 1
+                raise
+            except Exception as e:
+                self._done(member, start, e)
+                delay = self._retry_delay(member, e, attempt, tried)
+                if delay is None or not fits(delay):
+                    raise
+                await asyncio.sleep(delay)
+                continue
+            self._done(member, start)
+            return response
+
+    def stats(self):
+        now = time.monotonic()
+        return {m.name: m.stats(now) for m in self.members}
+
+
+def members_from_env():
+    """Pool members from GROQ_POOL or GROQ_API_KEYS; empty when neither is set"""
+    spec = os.getenv("GROQ_POOL")
+    if spec:
+        entries = json.loads(spec)
+        return [Member(**{"name": f"member-{i}", **entry}) for i, entry in enumerate(entries)]
+    keys = [key.strip() for key in os.getenv("GROQ_API_KEYS", "").split(",") if key.strip()]
+    return [Member(f"key-{i}", api_key=key) for i, key in enumerate(keys)]
+
+
+@lru_cache(maxsize=None)
+def get_pool():
+    """The process-wide client pool, or None when no pool is configured"""
+    members = members_from_env()
+    return ClientPool(members) if members else None
@@ -0,0 +1,196 @@
+import hashlib
+import json
+import os
+import random
+import re
+import sqlite3
+import threading
+import time
+
+import routing
+from compaction import as_dict
+from tracing import annotate
+
+# Seconds a cached agent answer stays fresh; 0 turns the prompt cache off
+PROMPT_CACHE_TTL = float(os.getenv("PROMPT_CACHE_TTL", "0"))
+PROMPT_CACHE_PATH = os.getenv("PROMPT_CACHE_PATH", "prompt_cache.db")
+PROMPT_CACHE_SIZE = int(os.getenv("PROMPT_CACHE_SIZE", "1000"))
+# Estimated Jaccard similarity of two prompts' shingles for a near-duplicate candidate
+PROMPT_CACHE_SIMILARITY = float(os.getenv("PROMPT_CACHE_SIMILARITY", "0.8"))
+
+SHINGLE_SIZE = 4
+NUM_HASHES = 64
+BANDS = 16  # LSH bands of NUM_HASHES // BANDS rows; more bands find less similar candidates
+_PRIME = (1 << 61) - 1
+_rng = random.Random(20240601)  # fixed seed: signatures are stored on disk
+_PERMUTATIONS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_HASHES)]
+
+
+# Words that may differ between near-duplicate prompts; any other difference is a miss
+FILLER_WORDS = {
+    "a", "an", "the", "and", "also", "please", "pls", "kindly", "hi", "hey", "can", "could", "would",
+    "you", "me", "i", "tell", "give", "show", "what", "whats", "is", "are", "want", "to", "know",
+    "of", "for", "some", "now", "right", "current", "currently",
+}
+
+
+def normalize_prompt(prompt):
+    """Casefolded words without punctuation, so trivially different prompts share a key"""
+    return " ".join(re.findall(r"\w+", re.sub(r"['’]", "", prompt.casefold())))
+
+
+def content_words(text):
+    """Words of a normalized prompt that carry meaning, in order; near-duplicates must agree on them"""
+    return [word for word in text.split() if word not in FILLER_WORDS]
+
+
+def minhash(text):
+    """MinHash signature of the text's character shingles"""
+    if len(text) <= SHINGLE_SIZE:
+        shingles = {text}
+    else:
+        shingles = {text[i:i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)}
+    hashes = [int.from_bytes(hashlib.blake2b(s.encode(), digest_size=8).digest(), "big") for s in shingles]
+    return [min((a * h + b) % _PRIME for h in hashes) for a, b in _PERMUTATIONS]
+
+
+def similarity(a, b):
+    """Estimated Jaccard similarity of two signatures"""
+    return sum(x == y for x, y in zip(a, b)) / len(a)
+
+
+def bands(signature):
+    rows = len(signature) // BANDS
+    return [
+        f"{i}:" + hashlib.blake2b(repr(signature[i * rows:(i + 1) * rows]).encode(), digest_size=8).hexdigest()
+        for i in range(BANDS)
+    ]
+
+
+class PromptCache:
+    """On-disk cache of whole agent runs keyed on the normalized prompt.
+
+    Besides exact matches, a prompt is served the answer of a cached prompt
+    whose MinHash signature is close enough (found through LSH bands) and
+    that differs from it only in FILLER_WORDS. Similarity alone is not
+    enough: "a joke" and "a quote" share most shingles. Entries expire after `ttl` seconds and the least
+    recently used ones are evicted beyond `max_entries`. `scope` keeps
+    answers from different routing profiles apart.
+    """
+
+    def __init__(self, path, ttl=PROMPT_CACHE_TTL, max_entries=PROMPT_CACHE_SIZE, threshold=PROMPT_CACHE_SIMILARITY):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self.hits = 0
+        self.near_hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS prompt_cache (key TEXT PRIMARY KEY, scope TEXT, signature TEXT, "
+            "words TEXT, value TEXT, expires_at REAL, used_at REAL);"
+            "CREATE TABLE IF NOT EXISTS prompt_bands (band TEXT, key TEXT);"
+            "CREATE INDEX IF NOT EXISTS prompt_bands_band ON prompt_bands (band);"
+            "CREATE INDEX IF NOT EXISTS prompt_bands_key ON prompt_bands (key);"
+        )
+        self._conn.commit()
+
+    def _key(self, scope, text):
+        return json.dumps([scope, text])
+
+    def _near(self, scope, text, now):
+        signature = minhash(text)
+        band_list = bands(signature)
+        rows = self._conn.execute(
+            "SELECT key, signature, words FROM prompt_cache WHERE scope = ? AND expires_at >= ? AND key IN "
+            f"(SELECT key FROM prompt_bands WHERE band IN ({','.join('?' * len(band_list))}))",
+            (scope, now, *band_list),
+        ).fetchall()
+        wanted = content_words(text)
+        best, best_score = None, self.threshold
+        for key, stored, stored_words in rows:
+            score = similarity(signature, json.loads(stored))
+            if score >= best_score and json.loads(stored_words) == wanted:
+                best, best_score = key, score
+        return best
+
+    def get(self, prompt, scope=""):
+        """Return `(final_response, messages, match)` with match "exact" or "near", or None"""
+        text = normalize_prompt(prompt)
+        now = time.time()
+        with self._lock:
+            key, match = self._key(scope, text), "exact"
+            row = self._conn.execute(
+                "SELECT value FROM prompt_cache WHERE key = ? AND expires_at >= ?", (key, now)
+            ).fetchone()
+            if row is None:
+                key, match = self._near(scope, text, now), "near"
+                if key is not None:
+                    row = self._conn.execute("SELECT value FROM prompt_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE prompt_cache SET used_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            if match == "exact":
+                self.hits += 1
+            else:
+                self.near_hits += 1
+        value = json.loads(row[0])
+        return value["response"], value["messages"], match
+
+    def set(self, prompt, final_response, messages, scope=""):
+        text = normalize_prompt(prompt)
+        key = self._key(scope, text)
+        signature = minhash(text)
+        value = json.dumps({"response": final_response, "messages": [as_dict(m) for m in messages]})
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO prompt_cache VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, scope, json.dumps(signature), json.dumps(content_words(text)), value, now + self.ttl, now),
+            )
+            self._conn.execute("DELETE FROM prompt_bands WHERE key = ?", (key,))
+            self._conn.executemany(
+                "INSERT INTO prompt_bands VALUES (?, ?)", [(band, key) for band in bands(signature)]
+            )
+            self._conn.execute(
+                "DELETE FROM prompt_cache WHERE key IN "
+                "(SELECT key FROM prompt_cache ORDER BY used_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            self._conn.execute("DELETE FROM prompt_bands WHERE key NOT IN (SELECT key FROM prompt_cache)")
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM prompt_cache")
+            self._conn.execute("DELETE FROM prompt_bands")
+            self._conn.commit()
+
+    def stats(self):
+        return {"hits": self.hits, "near_hits": self.near_hits, "misses": self.misses}
+
+
+prompt_cache = PromptCache(PROMPT_CACHE_PATH) if PROMPT_CACHE_TTL > 0 else None
+
+
+def lookup(user_prompt, on_token=None):
+    """`(final_response, messages)` from the prompt cache, or None; notes the outcome on the current span"""
+    if prompt_cache is None:
+        return None
+    cached = prompt_cache.get(user_prompt, routing.ROUTING_PROFILE)
+    if cached is None:
+        annotate(prompt_cache="miss")
+        return None
+    final_response, messages, match = cached
+    annotate(prompt_cache=match)
+    if on_token is not None:
+        on_token(final_response)  # streaming callers still see the answer arrive
+    return final_response, messages
+
+
+def store(user_prompt, final_response, messages):
+    if prompt_cache is not None and final_response:
+        prompt_cache.set(user_prompt, final_response, messages, routing.ROUTING_PROFILE)
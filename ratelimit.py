@@ -0,0 +1,186 @@
+import os
+import random
+import threading
+import time
+
+from deadline import DeadlineExceeded, fits, with_timeout
+from tracing import current_span
+
+# Defaults match the free tier limits for llama3-70b-8192; 0 disables a budget
+REQUESTS_PER_MINUTE = float(os.getenv("GROQ_REQUESTS_PER_MINUTE", "30"))
+TOKENS_PER_MINUTE = float(os.getenv("GROQ_TOKENS_PER_MINUTE", "6000"))
+MAX_RETRIES = int(os.getenv("GROQ_MAX_RETRIES", "4"))
+BASE_DELAY = 0.5
+MAX_DELAY = 30.0
+# Each request earns this fraction of a retry, so retries stay a bounded share of traffic
+RETRY_RATIO = 0.2
+RETRY_BUDGET = 10.0
+
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """Budget refilled continuously at `per_minute / 60` units per second.
+
+    `reserve` takes the units straight away and returns how long the caller
+    must wait for them, so concurrent callers queue up in arrival order.
+    """
+
+    def __init__(self, per_minute):
+        self.rate = per_minute / 60.0
+        self.capacity = per_minute
+        self.level = per_minute
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, amount):
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            self._refill()
+            self.level -= min(amount, self.capacity)
+            return 0.0 if self.level >= 0 else -self.level / self.rate
+
+    def refund(self, amount):
+        if self.rate <= 0:
+            return
+        with self._lock:
+            self._refill()
+            self.level = min(self.capacity, self.level + amount)
+
+
+def estimate_tokens(kwargs):
+    """Rough token count of a completion request (about 4 characters per token)"""
+    prompt_chars = len(str(kwargs.get("messages", ""))) + len(str(kwargs.get("tools", "")))
+    return prompt_chars // 4 + kwargs.get("max_tokens", 0)
+
+
+def retry_after(error):
+    """Seconds the server asked us to wait, if it sent a retry-after header"""
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    for header, scale in (("retry-after-ms", 0.001), ("retry-after", 1.0)):
+        value = response.headers.get(header)
+        if value is not None:
+            try:
+                return float(value) * scale
+            except ValueError:
+                pass
+    return None
+
+
+def is_retryable(error):
+    from groq import APIConnectionError, APIStatusError
+
+    if isinstance(error, APIStatusError):
+        return error.status_code in RETRYABLE_STATUS
+    return isinstance(error, APIConnectionError)  # includes timeouts
+
+
+class RateLimiter:
+    """Request and token budgets plus retry policy shared by every LLM call.
+
+    Calls wait for both budgets before they are sent. Rate limit and transient
+    errors are retried with jittered exponential backoff, or after the
+    server's retry-after delay, which also pauses every other caller.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute=REQUESTS_PER_MINUTE,
+        tokens_per_minute=TOKENS_PER_MINUTE,
+        max_retries=MAX_RETRIES,
+    ):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.max_retries = max_retries
+        self.retry_budget = RETRY_BUDGET
+        self.blocked_until = 0.0
+        self.retries = 0
+        self.throttled = 0
+        self._lock = threading.Lock()
+
+    def _acquire(self, tokens):
+        """Reserve budget for one request and return the delay before sending it"""
+        delay = max(self.requests.reserve(1), self.tokens.reserve(tokens))
+        delay = max(delay, self.blocked_until - time.monotonic())
+        with self._lock:
+            self.retry_budget = min(self.retry_budget + RETRY_RATIO, RETRY_BUDGET)
+            if delay > 0:
+                self.throttled += 1
+        if delay > 0:
+            current_span().add("throttle_wait", round(delay, 3))
+        return delay
+
+    def _settle(self, estimated, response):
+        usage = getattr(response, "usage", None)
+        if usage is not None and usage.total_tokens is not None:
+            self.tokens.refund(estimated - usage.total_tokens)
+
+    def _backoff(self, error, attempt):
+        """Delay before the next attempt, or None if the error should propagate"""
+        if attempt >= self.max_retries or not is_retryable(error):
+            return None
+        with self._lock:
+            if self.retry_budget < 1:
+                return None
+            self.retry_budget -= 1
+            self.retries += 1
+        current_span().add("retries")
+        delay = retry_after(error)
+        if delay is not None:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + delay)
+            return delay
+        return random.uniform(0, min(MAX_DELAY, BASE_DELAY * 2 ** attempt))
+
+    def call(self, create, **kwargs):
+        estimated = estimate_tokens(kwargs)
+        for attempt in range(self.max_retries + 1):
+            delay = self._acquire(estimated)
+            if delay > 0:
+                if not fits(delay):
+                    raise DeadlineExceeded("Rate limit wait would pass the deadline")
+                time.sleep(delay)
+            try:
+                response = create(**with_timeout(kwargs))
+            except Exception as e:
+                delay = self._backoff(e, attempt)
+                if delay is None or not fits(delay):
+                    raise
+                time.sleep(delay)
+                continue
+            self._settle(estimated, response)
+            return response
+
+    async def acall(self, create, **kwargs):
+        import asyncio
+
+        estimated = estimate_tokens(kwargs)
+        for attempt in range(self.max_retries + 1):
+            delay = self._acquire(estimated)
+            if delay > 0:
+                if not fits(delay):
+                    raise DeadlineExceeded("Rate limit wait would pass the deadline")
+                await asyncio.sleep(delay)
+            try:
+                response = await create(**with_timeout(kwargs))
+            except Exception as e:
+                delay = self._backoff(e, attempt)
+                if delay is None or not fits(delay):
+                    raise
+                await asyncio.sleep(delay)
+                continue
+            self._settle(estimated, response)
+            return response
+
+    def stats(self):
+        return {"retries": self.retries, "throttled": self.throttled}
+
+
+limiter = RateLimiter()
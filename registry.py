@@ -0,0 +1,143 @@
+import inspect
+import json
+import typing
+
+# JSON schema types for the Python annotations tools may use
+JSON_TYPES = {
+    str: "string",
+    int: "integer",
+    float: "number",
+    bool: "boolean",
+    list: "array",
+    dict: "object",
+}
+
+# Python types accepted for each JSON schema type
+PYTHON_TYPES = {
+    "string": (str,),
+    "integer": (int,),
+    "number": (int, float),
+    "boolean": (bool,),
+    "array": (list,),
+    "object": (dict,),
+}
+
+
+class ToolArgumentError(ValueError):
+    """Raised when a tool call names an unknown tool or has invalid arguments"""
+
+
+def _json_type(annotation):
+    if annotation in JSON_TYPES:
+        return JSON_TYPES[annotation]
+    # Optional[X] / X | None
+    args = [arg for arg in typing.get_args(annotation) if arg is not type(None)]
+    if len(args) == 1 and args[0] in JSON_TYPES:
+        return JSON_TYPES[args[0]]
+    raise TypeError(f"Unsupported tool parameter annotation: {annotation!r}")
+
+
+def build_schema(func, description, param_descriptions):
+    """Build the function-calling schema from a tool's signature and type hints"""
+    hints = typing.get_type_hints(func)
+    properties = {}
+    required = []
+    for name, param in inspect.signature(func).parameters.items():
+        properties[name] = {
+            "type": _json_type(hints.get(name, str)),
+            "description": param_descriptions.get(name, name),
+        }
+        if param.default is inspect.Parameter.empty:
+            required.append(name)
+    return {
+        "type": "function",
+        "function": {
+            "name": func.__name__,
+            "description": description,
+            "parameters": {
+                "type": "object",
+                "properties": properties,
+                "required": required,
+            },
+        },
+    }
+
+
+class ToolRegistry:
+    """Tools registered with `@registry.tool(...)`.
+
+    Schemas are generated once at registration time and dispatch goes through a
+    name -> function table, with arguments checked against the schema before
+    the tool runs.
+    """
+
+    def __init__(self):
+        self.functions = {}
+        self.schemas = []
+        self.keywords = {}  # extra words for tool selection; never sent to the model
+        self._parameters = {}
+        self._schemas_json = None
+
+    def tool(self, description, keywords=(), **param_descriptions):
+        def decorator(func):
+            self.register(func, description, param_descriptions, keywords)
+            return func
+        return decorator
+
+    def register(self, func, description, param_descriptions=None, keywords=()):
+        schema = build_schema(func, description, param_descriptions or {})
+        self.functions[func.__name__] = func
+        self.schemas.append(schema)
+        self.keywords[func.__name__] = tuple(keywords)
+        self._parameters[func.__name__] = schema["function"]["parameters"]
+        self._schemas_json = None
+
+    def bind(self, functions):
+        """Return a registry with the same schemas dispatching to `functions`.
+
+        Used by the async tool layer to reuse the schemas of the sync tools.
+        """
+        bound = ToolRegistry()
+        bound.schemas = self.schemas
+        bound.keywords = self.keywords
+        bound._parameters = self._parameters
+        bound.functions = {name: functions[name] for name in self.functions}
+        return bound
+
+    @property
+    def names(self):
+        return list(self.functions)
+
+    @property
+    def schemas_json(self):
+        """The schemas serialized once, e.g. for payload size accounting"""
+        if self._schemas_json is None:
+            self._schemas_json = json.dumps(self.schemas)
+        return self._schemas_json
+
+    def validate(self, name, args):
+        """Check tool arguments against the schema, raising ToolArgumentError"""
+        parameters = self._parameters.get(name)
+        if parameters is None:
+            raise ToolArgumentError(f"Unknown tool: {name}")
+        if not isinstance(args, dict):
+            raise ToolArgumentError(f"Arguments for {name} must be a JSON object")
+        properties = parameters["properties"]
+        unexpected = sorted(set(args) - set(properties))
+        if unexpected:
+            raise ToolArgumentError(f"Unexpected arguments for {name}: {', '.join(unexpected)}")
+        missing = [param for param in parameters["required"] if param not in args]
+        if missing:
+            raise ToolArgumentError(f"Missing arguments for {name}: {', '.join(missing)}")
+        for param, value in args.items():
+            expected = properties[param]["type"]
+            # bool is an int subclass, but true/false is never a valid number
+            if isinstance(value, bool) and expected != "boolean" or not isinstance(value, PYTHON_TYPES[expected]):
+                raise ToolArgumentError(f"Argument '{param}' of {name} must be of type {expected}")
+        return args
+
+    def call(self, name, args):
+        """Validate `args` and invoke the tool registered under `name`"""
+        self.validate(name, args)
+        func = self.functions[name]
+        return func(**args) if args else func()
@@ -0,0 +1,58 @@
+import json
+import os
+
+MODEL = "llama3-70b-8192"
+SMALL_MODEL = "llama3-8b-8192"
+
+# Completion settings per routing profile. "tools" entries apply to the
+# synthetic tool completions (by tool name, plus "fused" for fused requests);
+# "agent" entries apply to the agent's own completions by phase: "plan" is
+# the first completion, which picks the tools, and "answer" is every later
+# one, which usually writes the final answer from the tool results. "*"
+# matches every name; unset keys keep the caller's defaults.
+PROFILES = {
+    "default": {},
+    "fast-tools": {
+        "tools": {"*": {"model": SMALL_MODEL}},
+    },
+    "small": {
+        "tools": {"*": {"model": SMALL_MODEL}},
+        "agent": {"*": {"model": SMALL_MODEL}},
+    },
+    "lean": {
+        "tools": {
+            "*": {"model": SMALL_MODEL},
+            "get_time": {"max_tokens": 40},
+            "get_joke": {"max_tokens": 45},
+            "get_quote": {"max_tokens": 45},
+        },
+        "agent": {"plan": {"max_tokens": 150}, "answer": {"max_tokens": 200}},
+    },
+}
+
+
+def _load_profiles(path):
+    """Extra profiles from a JSON file with the same layout as PROFILES"""
+    if not path:
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+PROFILES.update(_load_profiles(os.getenv("ROUTING_FILE")))
+
+# Profile used for every completion; bench.routing switches it between runs
+ROUTING_PROFILE = os.getenv("ROUTING_PROFILE", "default")
+if ROUTING_PROFILE not in PROFILES:
+    raise ValueError(f"Unknown ROUTING_PROFILE {ROUTING_PROFILE!r}; choose from {', '.join(PROFILES)}")
+
+
+def route(kind, name, defaults):
+    """Model, temperature and max_tokens for one completion.
+
+    `kind` is "tools" or "agent" and `name` a tool name or agent phase.
+    `defaults` is overridden by the active profile's "*" entry and then by
+    its entry for `name`.
+    """
+    routes = PROFILES[ROUTING_PROFILE].get(kind, {})
+    return {**defaults, **routes.get("*", {}), **routes.get(name, {})}
@@ -0,0 +1,144 @@
+"""HTTP API for the tool-calling agent.
+
+    POST /agent          {"prompt": ..., "timeout": seconds?} -> JSON result
+    POST /agent/stream   same body -> Server-Sent Events
+    GET  /healthz
+
+Every request runs the async agent on the worker's event loop, so one worker
+serves many concurrent requests. Start it with `python main.py serve`.
+"""
+
+import asyncio
+import json
+from contextlib import asynccontextmanager
+
+from dotenv import load_dotenv
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+load_dotenv()  # uvicorn may import this module directly, before anything else
+
+from async_agent import run_agent
+from client import get_async_client
+from compaction import tool_trace
+from tracing import start_trace
+
+
+class BadRequest(ValueError):
+    pass
+
+
+async def _read_request(request):
+    try:
+        body = await request.json()
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        raise BadRequest("Request body must be JSON")
+    if not isinstance(body, dict) or not isinstance(body.get("prompt"), str) or not body["prompt"].strip():
+        raise BadRequest("'prompt' must be a non-empty string")
+    timeout = body.get("timeout")
+    if timeout is not None and (isinstance(timeout, bool) or not isinstance(timeout, (int, float)) or timeout <= 0):
+        raise BadRequest("'timeout' must be a positive number of seconds")
+    return body["prompt"], timeout
+
+
+async def agent(request):
+    try:
+        prompt, timeout = await _read_request(request)
+    except BadRequest as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
+    try:
+        with start_trace("server") as trace:
+            final_response, messages = await run_agent(prompt, timeout=timeout)
+    except Exception as e:
+        return JSONResponse({"error": str(e)}, status_code=502)
+    return JSONResponse({
+        "response": final_response,
+        "tool_calls": tool_trace(messages),
+        "usage": trace.totals(),
+        "trace_id": trace.trace_id,
+    })
+
+
+def sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def agent_stream(request):
+    """Stream a run as `step`, `tool`, `token` and finally `done` (or `error`) events"""
+    try:
+        prompt, timeout = await _read_request(request)
+    except BadRequest as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
+
+    events = asyncio.Queue()
+    names = {}
+
+    def on_message(msg):
+        calls = [
+            {"id": call.id, "name": call.function.name, "arguments": call.function.arguments}
+            for call in msg.tool_calls or []
+        ]
+        names.update((call["id"], call["name"]) for call in calls)
+        events.put_nowait(sse("step", {"tool_calls": calls}))
+
+    def on_tool_result(message):
+        tool_call_id = message["tool_call_id"]
+        events.put_nowait(sse("tool", {
+            "tool_call_id": tool_call_id,
+            "name": names.get(tool_call_id),
+            "content": message["content"],
+        }))
+
+    async def run():
+        try:
+            with start_trace("server") as trace:
+                final_response, _ = await run_agent(
+                    prompt,
+                    timeout=timeout,
+                    on_message=on_message,
+                    on_token=lambda text: events.put_nowait(sse("token", {"text": text})),
+                    on_tool_result=on_tool_result,
+                )
+            events.put_nowait(sse("done", {
+                "response": final_response,
+                "usage": trace.totals(),
+                "trace_id": trace.trace_id,
+            }))
+        except Exception as e:
+            events.put_nowait(sse("error", {"error": str(e)}))
+        events.put_nowait(None)
+
+    async def stream():
+        task = asyncio.create_task(run())
+        try:
+            while (event := await events.get()) is not None:
+                yield event
+        finally:
+            task.cancel()  # the client went away
+
+    return StreamingResponse(stream(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+
+async def healthz(request):
+    return JSONResponse({"status": "ok"})
+
+
+@asynccontextmanager
+async def lifespan(app):
+    get_async_client()  # import groq and build the client before the first request
+    yield
+
+
+app = Starlette(lifespan=lifespan, routes=[
+    Route("/agent", agent, methods=["POST"]),
+    Route("/agent/stream", agent_stream, methods=["POST"]),
+    Route("/healthz", healthz),
+])
+
+
+def serve(host="127.0.0.1", port=8000, workers=1):
+    """Run the API with uvicorn; with several workers each process has its own event loop"""
+    import uvicorn
+
+    uvicorn.run("server:app", host=host, port=port, workers=workers, log_level="info")
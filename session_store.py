@@ -0,0 +1,76 @@
+import json
+import os
+from collections import OrderedDict
+
+# Bounds for the results each Streamlit session keeps; the oldest are evicted first
+SESSION_STORE_MAX_ENTRIES = int(os.getenv("SESSION_STORE_MAX_ENTRIES", "50"))
+SESSION_STORE_MAX_BYTES = int(os.getenv("SESSION_STORE_MAX_BYTES", "2000000"))
+
+
+def _encode(value):
+    if hasattr(value, "to_jsonl"):  # a trace
+        return value.to_jsonl()
+    if hasattr(value, "model_dump"):  # an SDK message
+        return value.model_dump()
+    return str(value)
+
+
+def entry_size(value):
+    """Approximate size of a stored value, as the length of its JSON"""
+    return len(json.dumps(value, default=_encode))
+
+
+class SessionStore:
+    """Results kept across Streamlit reruns, in insertion order.
+
+    Lives in `st.session_state`, so each browser session has its own. Once
+    more than `max_entries` values are stored, or their estimated size
+    passes `max_bytes`, the oldest are evicted; the newest is always kept.
+    """
+
+    def __init__(self, max_entries=SESSION_STORE_MAX_ENTRIES, max_bytes=SESSION_STORE_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._sizes = {}
+
+    def put(self, key, value):
+        self.pop(key)
+        self._entries[key] = value
+        self._sizes[key] = entry_size(value)
+        self.bytes += self._sizes[key]
+        while len(self._entries) > 1 and (len(self._entries) > self.max_entries or self.bytes > self.max_bytes):
+            self.pop(next(iter(self._entries)))
+            self.evictions += 1
+
+    def get(self, key, default=None):
+        return self._entries.get(key, default)
+
+    def pop(self, key):
+        if key in self._entries:
+            self.bytes -= self._sizes.pop(key)
+            return self._entries.pop(key)
+        return None
+
+    def values(self):
+        return list(self._entries.values())
+
+    def last(self):
+        return next(reversed(self._entries.values()), None)
+
+    def clear(self):
+        self._entries.clear()
+        self._sizes.clear()
+        self.bytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def get_session_store(state, name):
+    """The SessionStore called `name` in a Streamlit session state, created on first use"""
+    if name not in state:
+        state[name] = SessionStore()
+    return state[name]
@@ -0,0 +1,107 @@
+import os
+import threading
+
+# Tools whose concurrent identical calls share one completion. Jokes and
+# quotes are left out so simultaneous users still get different answers.
+COALESCE_TOOLS = {"get_current_weather", "get_time", "get_news", "calculate_sum"}
+
+# Also share one agent run between identical concurrent prompts
+COALESCE_AGENT_PROMPTS = os.getenv("COALESCE_AGENT_PROMPTS", "0") == "1"
+
+
+def prompt_key(prompt):
+    return " ".join(prompt.split()).casefold()
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class SingleFlight:
+    """Collapse concurrent calls with the same key into one execution.
+
+    The first caller for a key (the leader) runs the function; callers that
+    arrive while it is in flight wait for its result, or its exception,
+    instead of running it again. Nothing is kept once the call finishes, so
+    this complements the result cache rather than replacing it.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._futures = {}
+        self._lock = threading.Lock()
+        self.executed = 0
+        self.collapsed = 0
+
+    def _join(self, calls, key, new):
+        with self._lock:
+            call = calls.get(key)
+            if call is None:
+                call = calls[key] = new()
+                self.executed += 1
+                return call, True
+            self.collapsed += 1
+            return call, False
+
+    def do(self, key, fn, *args):
+        """Return `(result, shared)`; `shared` is True when another caller's result was reused"""
+        call, leader = self._join(self._calls, key, _Call)
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.value, True
+        try:
+            call.value = fn(*args)
+            return call.value, False
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    async def ado(self, key, fn, *args):
+        """Async counterpart of `do` for coroutine functions on one event loop"""
+        import asyncio
+
+        future, leader = self._join(self._futures, key, asyncio.get_running_loop().create_future)
+        if not leader:
+            try:
+                return await asyncio.shield(future), True
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+                return await fn(*args), False  # the leader was cancelled, not us
+        try:
+            value = await fn(*args)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # mark retrieved when nobody else was waiting
+            raise
+        else:
+            future.set_result(value)
+            return value, False
+        finally:
+            with self._lock:
+                del self._futures[key]
+
+    def stats(self):
+        with self._lock:
+            total = self.executed + self.collapsed
+            return {
+                "executed": self.executed,
+                "collapsed": self.collapsed,
+                "collapse_rate": self.collapsed / total if total else 0.0,
+            }
+
+
+tool_flight = SingleFlight()
+agent_flight = SingleFlight()
@@ -0,0 +1,85 @@
+from deadline import DeadlineExceeded, remaining
+from tracing import record_usage
+
+
+def _add_chunk(chunk, content, calls, on_token):
+    x_groq = getattr(chunk, "x_groq", None)
+    if x_groq is not None and x_groq.usage is not None:
+        record_usage(x_groq.usage)  # sent with the last chunk
+    if not chunk.choices:
+        return
+    delta = chunk.choices[0].delta
+    if delta.content:
+        content.append(delta.content)
+        if on_token:
+            on_token(delta.content)
+    for tool_call in delta.tool_calls or []:
+        call = calls.setdefault(tool_call.index, {"id": None, "name": None, "arguments": ""})
+        if tool_call.id:
+            call["id"] = tool_call.id
+        if tool_call.function:
+            if tool_call.function.name:
+                call["name"] = tool_call.function.name
+            if tool_call.function.arguments:
+                call["arguments"] += tool_call.function.arguments
+
+
+def _message(content, calls):
+    from groq.types.chat import ChatCompletionMessage, ChatCompletionMessageToolCall
+    from groq.types.chat.chat_completion_message_tool_call import Function
+
+    tool_calls = [
+        ChatCompletionMessageToolCall(
+            id=call["id"],
+            type="function",
+            function=Function(name=call["name"], arguments=call["arguments"]),
+        )
+        for _, call in sorted(calls.items())
+    ]
+    return ChatCompletionMessage(
+        role="assistant",
+        content="".join(content) or None,
+        tool_calls=tool_calls or None,
+    )
+
+
+def collect_stream(chunks, on_token=None):
+    """Assemble streamed completion chunks into a single assistant message.
+
+    Content deltas are forwarded to `on_token` as soon as they arrive. Tool call
+    deltas are merged by their `index`, since a call's id and name arrive in its
+    first delta and the JSON arguments may be split over several chunks.
+
+    The request timeout only bounds each read, so the deadline is checked
+    between chunks; once it passes the stream is closed and DeadlineExceeded
+    raised.
+    """
+    content = []
+    calls = {}
+    for chunk in chunks:
+        if remaining() == 0:
+            if hasattr(chunks, "close"):
+                chunks.close()
+            raise DeadlineExceeded("Deadline exceeded while streaming the response")
+        _add_chunk(chunk, content, calls, on_token)
+    return _message(content, calls)
+
+
+async def acollect_stream(chunks, on_token=None):
+    """Async counterpart of `collect_stream` for AsyncGroq streams; each chunk is awaited until the deadline"""
+    import asyncio
+
+    content = []
+    calls = {}
+    iterator = chunks.__aiter__()
+    while True:
+        try:
+            chunk = await asyncio.wait_for(anext(iterator), remaining())
+        except StopAsyncIteration:
+            break
+        except asyncio.TimeoutError:
+            if hasattr(chunks, "close"):
+                await chunks.close()
+            raise DeadlineExceeded("Deadline exceeded while streaming the response")
+        _add_chunk(chunk, content, calls, on_token)
+    return _message(content, calls)
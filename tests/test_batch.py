@@ -0,0 +1,44 @@
+import json
+
+from batch import completed_ids
+
+
+def test_missing_output_has_no_completed_ids(tmp_path):
+    assert completed_ids(tmp_path / "out.jsonl") == set()
+
+
+def test_failed_prompts_are_not_completed(tmp_path):
+    path = tmp_path / "out.jsonl"
+    records = [{"id": "1", "response": "ok"}, {"id": "2", "error": "timed out"}, {"id": "3", "response": "ok"}]
+    path.write_text("".join(json.dumps(r) + "\n" for r in records))
+    assert completed_ids(path) == {"1", "3"}
+    assert [json.loads(line)["id"] for line in path.read_text().splitlines()] == ["1", "3"]
+
+
+def test_rerun_prompt_is_recorded_once(tmp_path):
+    path = tmp_path / "out.jsonl"
+    path.write_text(json.dumps({"id": "1", "error": "timed out"}) + "\n")
+    assert completed_ids(path) == set()
+    with open(path, "a") as out:
+        out.write(json.dumps({"id": "1", "response": "ok"}) + "\n")
+    assert completed_ids(path) == {"1"}
+    assert [json.loads(line) for line in path.read_text().splitlines()] == [{"id": "1", "response": "ok"}]
+
+
+def test_clean_output_is_left_alone(tmp_path):
+    path = tmp_path / "out.jsonl"
+    path.write_text(json.dumps({"id": "1", "response": "ok"}) + "\n")
+    mtime = path.stat().st_mtime_ns
+    assert completed_ids(path) == {"1"}
+    assert path.stat().st_mtime_ns == mtime
+    assert not (tmp_path / "out.jsonl.partial").exists()
+
+
+def test_partial_last_line_is_cut_off(tmp_path):
+    path = tmp_path / "out.jsonl"
+    path.write_text(json.dumps({"id": "1", "response": "ok"}) + "\n" + '{"id": "2", "resp')
+    assert completed_ids(path) == {"1"}
+    with open(path, "a") as out:
+        out.write(json.dumps({"id": "2", "response": "ok"}) + "\n")
+    assert completed_ids(path) == {"1", "2"}
+    assert all(json.loads(line) for line in path.read_text().splitlines())
@@ -0,0 +1,74 @@
+import pytest
+
+from cache import MemoryStore, SQLiteStore, ToolCache
+from prompt_cache import PromptCache
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        return MemoryStore(max_entries=2)
+    return SQLiteStore(str(tmp_path / "cache.db"), max_entries=2)
+
+
+def test_least_recently_used_entry_is_evicted(store, clock):
+    store.set("a", "1", ttl=60)
+    clock.advance(1)
+    store.set("b", "2", ttl=60)
+    clock.advance(1)
+    assert store.get("a") == "1"  # now b is the least recently used
+    clock.advance(1)
+    store.set("c", "3", ttl=60)
+    assert store.get("b") is None
+    assert store.get("a") == "1"
+    assert store.get("c") == "3"
+
+
+def test_entries_expire_after_their_ttl(store, clock):
+    store.set("a", "1", ttl=10)
+    clock.advance(10)
+    assert store.get("a") == "1"
+    clock.advance(1)
+    assert store.get("a") is None
+
+
+def test_tool_cache_uses_per_tool_ttls(clock):
+    cache = ToolCache(MemoryStore(), ttls={"get_time": 60, "get_joke": None})
+    request = {"model": "m", "temperature": 0}
+    cache.set("get_time", {"location": "Paris"}, request, "noon")
+    cache.set("get_joke", {}, request, "ha")
+    assert cache.get("get_time", {"location": "  paris "}, request) == "noon"
+    assert cache.get("get_joke", {}, request) is None
+    assert cache.status("get_joke", None) == "off"
+    clock.advance(61)
+    assert cache.get("get_time", {"location": "Paris"}, request) is None
+    assert cache.stats() == {"hits": 1, "misses": 1}
+
+
+
+def test_sqlite_store_survives_a_restart(tmp_path, clock):
+    path = str(tmp_path / "cache.db")
+    SQLiteStore(path).set("a", "1", ttl=60)
+    assert SQLiteStore(path).get("a") == "1"
+
+
+def test_prompt_cache_evicts_and_expires(tmp_path, clock):
+    cache = PromptCache(str(tmp_path / "prompts.db"), ttl=60, max_entries=2)
+    cache.set("weather in Paris", "sunny", [])
+    clock.advance(1)
+    cache.set("weather in Rome", "rainy", [])
+    clock.advance(1)
+    assert cache.get("Weather in Paris?")[0] == "sunny"
+    clock.advance(1)
+    cache.set("weather in Oslo", "snowy", [])
+    assert cache.get("weather in Rome") is None
+    clock.advance(61)
+    assert cache.get("weather in Oslo") is None
+
+
+def test_prompt_cache_near_hits_differ_only_in_filler_words(tmp_path):
+    cache = PromptCache(str(tmp_path / "prompts.db"), ttl=60)
+    cache.set("weather in Paris then time in Tokyo", "Paris is sunny; it is noon in Tokyo", [])
+    assert cache.get("weather in Paris then time in Tokyo please")[2] == "near"
+    assert cache.get("weather in Tokyo then time in Paris") is None
+    assert cache.get("weather in Paris then time in Tokyo Tokyo") is None
@@ -0,0 +1,82 @@
+import json
+
+import httpx
+
+from cassette import Cassette, RecordingTransport, ReplayTransport
+
+URL = "https://api.groq.com/openai/v1/chat/completions"
+
+
+def body(tool_result, user="What time is it in Tokyo?"):
+    return {
+        "model": "llama3-70b-8192",
+        "messages": [
+            {"role": "user", "content": user},
+            {"role": "assistant", "content": None, "tool_calls": [
+                {"id": "call_1", "type": "function", "function": {"name": "get_time", "arguments": "{}"}},
+            ]},
+            {"role": "tool", "tool_call_id": "call_1", "content": tool_result},
+        ],
+    }
+
+
+def record(path, exchanges):
+    """Record `(request body, answer)` pairs through a mock upstream"""
+    answers = iter(answer for _, answer in exchanges)
+    upstream = httpx.MockTransport(lambda request: httpx.Response(200, json={"answer": next(answers)}))
+    with httpx.Client(transport=RecordingTransport(upstream, path)) as client:
+        for request_body, _ in exchanges:
+            client.post(URL, json=request_body).read()
+
+
+def replay(cassette, request_body):
+    with httpx.Client(transport=ReplayTransport(cassette, latency=False)) as client:
+        response = client.post(URL, json=request_body)
+    return response.status_code, response.json()
+
+
+def test_exact_match_replays_in_recording_order(tmp_path):
+    path = tmp_path / "cassette.jsonl"
+    record(path, [(body("09:00"), "first"), (body("09:00"), "second")])
+    cassette = Cassette(path)
+    answers = [replay(cassette, body("09:00"))[1]["answer"] for _ in range(3)]
+    assert answers == ["first", "second", "second"]  # the last recording repeats
+    assert cassette.stats() == {"exact": 3, "loose": 0, "misses": 0}
+
+
+def test_loose_match_ignores_tool_results(tmp_path):
+    path = tmp_path / "cassette.jsonl"
+    record(path, [(body("09:00"), "recorded")])
+    cassette = Cassette(path)
+    assert replay(cassette, body("09:05")) == (200, {"answer": "recorded"})
+    assert cassette.stats() == {"exact": 0, "loose": 1, "misses": 0}
+
+
+def test_exact_match_wins_over_loose(tmp_path):
+    path = tmp_path / "cassette.jsonl"
+    record(path, [(body("09:00"), "at nine"), (body("10:00"), "at ten")])
+    cassette = Cassette(path)
+    assert replay(cassette, body("10:00"))[1]["answer"] == "at ten"
+    assert cassette.stats()["exact"] == 1
+
+
+def test_different_prompt_misses(tmp_path):
+    path = tmp_path / "cassette.jsonl"
+    record(path, [(body("09:00"), "recorded")])
+    cassette = Cassette(path)
+    status, error = replay(cassette, body("09:00", user="What time is it in Paris?"))
+    assert status == 404
+    assert error["error"]["type"] == "cassette_miss"
+    assert cassette.stats() == {"exact": 0, "loose": 0, "misses": 1}
+
+
+def test_recording_keeps_only_safe_headers(tmp_path):
+    path = tmp_path / "cassette.jsonl"
+    upstream = httpx.MockTransport(lambda request: httpx.Response(
+        200, json={}, headers={"retry-after": "1", "set-cookie": "secret"},
+    ))
+    with httpx.Client(transport=RecordingTransport(upstream, path)) as client:
+        client.post(URL, json=body("09:00")).read()
+    entry = json.loads(path.read_text())
+    assert entry["request"]["body"] == body("09:00")
+    assert set(entry["response"]["headers"]) == {"content-type", "retry-after"}
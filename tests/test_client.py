@@ -0,0 +1,79 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+import client
+
+
+class Stream:
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.closed = False
+
+    async def __aiter__(self):
+        for chunk in self.chunks:
+            yield chunk
+
+    async def close(self):
+        self.closed = True
+
+
+def fake_client(monkeypatch, semaphore):
+    async def create(**kwargs):
+        return Stream(["a", "b"]) if kwargs.get("stream") else "response"
+
+    completions = SimpleNamespace(create=create)
+    monkeypatch.setattr(client, "get_async_client", lambda: SimpleNamespace(chat=SimpleNamespace(completions=completions)))
+    monkeypatch.setattr(client, "llm_semaphore", lambda: semaphore)
+
+
+def test_response_releases_slot(monkeypatch):
+    async def main():
+        semaphore = asyncio.Semaphore(1)
+        fake_client(monkeypatch, semaphore)
+        assert await client._send(model="m") == "response"
+        assert not semaphore.locked()
+
+    asyncio.run(main())
+
+
+def test_stream_holds_slot_until_read(monkeypatch):
+    async def main():
+        semaphore = asyncio.Semaphore(1)
+        fake_client(monkeypatch, semaphore)
+        stream = await client._send(model="m", stream=True)
+        assert semaphore.locked()
+        assert [chunk async for chunk in stream] == ["a", "b"]
+        assert not semaphore.locked()
+        await stream.close()  # releasing twice would let two requests through
+        assert semaphore._value == 1
+
+    asyncio.run(main())
+
+
+def test_stream_releases_slot_on_close(monkeypatch):
+    async def main():
+        semaphore = asyncio.Semaphore(1)
+        fake_client(monkeypatch, semaphore)
+        stream = await client._send(model="m", stream=True)
+        await stream.close()
+        assert stream._stream.closed
+        assert not semaphore.locked()
+
+    asyncio.run(main())
+
+
+def test_failed_request_releases_slot(monkeypatch):
+    async def main():
+        semaphore = asyncio.Semaphore(1)
+        monkeypatch.setattr(client, "llm_semaphore", lambda: semaphore)
+
+        async def fail(**kwargs):
+            raise ConnectionError("down")
+
+        with pytest.raises(ConnectionError):
+            await client._in_flight(fail, {"stream": True})
+        assert not semaphore.locked()
+
+    asyncio.run(main())
@@ -0,0 +1,91 @@
+import json
+
+from compaction import compact_messages, estimate_tokens, message_tokens, truncate_text
+
+
+def tool_step(call_id, name, output):
+    call = {"id": call_id, "type": "function", "function": {"name": name, "arguments": "{}"}}
+    return [
+        {"role": "assistant", "content": None, "tool_calls": [call]},
+        {"role": "tool", "tool_call_id": call_id, "content": output},
+    ]
+
+
+def conversation():
+    """Two earlier turns with tool calls, then a new prompt with one step so far"""
+    messages = []
+    for turn in range(2):
+        messages.append({"role": "user", "content": f"Question {turn} about the weather"})
+        messages += tool_step(f"call_{turn}", "get_weather", "sunny and warm " * 20)
+        messages.append({"role": "assistant", "content": f"Answer {turn}: it is sunny."})
+    messages.append({"role": "user", "content": "And what time is it in Tokyo?"})
+    messages += tool_step("call_2", "get_time", "12:00")
+    return messages
+
+
+def test_fitting_messages_are_returned_unchanged():
+    messages = conversation()
+    assert compact_messages(messages, budget=10_000) == messages
+
+
+def test_earlier_turns_are_dropped_oldest_first():
+    messages = conversation()
+    compacted = compact_messages(messages, budget=200)
+    assert compacted[0]["content"] == "Question 1 about the weather"
+    assert compacted[-3:] == messages[-3:]
+    assert sum(message_tokens(m) for m in compacted) <= 200
+
+
+def test_latest_prompt_stays_a_user_message():
+    messages = conversation()
+    compacted = compact_messages(messages, budget=40)
+    assert [m["role"] for m in compacted] == ["user", "assistant", "tool"]
+    assert compacted[0] == messages[-3]
+
+
+def test_steps_of_the_current_turn_are_folded_after_its_prompt():
+    messages = [{"role": "user", "content": "Weather in three cities?"}]
+    for i in range(3):
+        messages += tool_step(f"call_{i}", "get_weather", f"city {i}: " + "rain " * 40)
+    compacted = compact_messages(messages, budget=120)
+    assert [m["role"] for m in compacted] == ["user", "assistant", "assistant", "tool"]
+    assert compacted[1]["content"].startswith("Results of earlier tool calls:")
+    assert compacted[-2:] == messages[-2:]
+
+
+def test_original_messages_are_not_modified():
+    messages = conversation()
+    before = [dict(m) for m in messages]
+    compact_messages(messages, budget=40)
+    assert messages == before
+
+
+def test_long_tool_outputs_are_truncated():
+    messages = [{"role": "user", "content": "News?"}, *tool_step("call_0", "get_news", "word " * 2000)]
+    compacted = compact_messages(messages, budget=10_000)
+    assert compacted[-1]["content"].endswith("chars]")
+    assert message_tokens(compacted[-1]) < message_tokens(messages[-1])
+
+
+def test_truncated_json_outputs_stay_valid_and_keep_their_keys():
+    output = json.dumps({"topic": "ai", "headline": "word " * 2000})
+    compacted = truncate_text(output, 50)
+    assert set(json.loads(compacted)) == {"topic", "headline"}
+
+
+def test_text_of_earlier_tool_calls_is_dropped_first():
+    messages = [{"role": "user", "content": "Weather and time?"}]
+    messages += tool_step("call_0", "get_weather", "sunny")
+    messages += tool_step("call_1", "get_time", "noon")
+    messages[1]["content"] = "Let me think about which tool to call first. " * 10
+    budget = sum(message_tokens(m) for m in messages) - 10
+    compacted = compact_messages(messages, budget=budget)
+    assert [m["role"] for m in compacted] == [m["role"] for m in messages]
+    assert compacted[1]["content"] is None
+    assert compacted[1]["tool_calls"] == messages[1]["tool_calls"]
+
+
+def test_estimate_tokens_counts_words_and_symbols():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("Hello, world!") == 4
+    assert estimate_tokens("a" * 16) == 3
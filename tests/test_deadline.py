@@ -0,0 +1,24 @@
+from deadline import FINAL_ANSWER_RESERVE, deadline, remaining, step_time_limit
+
+
+def test_no_limit_leaves_steps_unlimited():
+    assert step_time_limit(None) is None
+
+
+def test_long_limits_keep_the_full_reserve():
+    assert step_time_limit(20) == 20 - FINAL_ANSWER_RESERVE
+
+
+def test_short_limits_keep_a_quarter_for_the_answer():
+    assert step_time_limit(1) == 0.75
+    assert step_time_limit(FINAL_ANSWER_RESERVE) == FINAL_ANSWER_RESERVE * 0.75
+
+
+def test_nested_deadlines_only_shorten():
+    assert remaining() is None
+    with deadline(10):
+        with deadline(100):
+            assert remaining() <= 10
+        with deadline(None):
+            assert remaining() <= 10
+    assert remaining() is None
@@ -0,0 +1,74 @@
+import asyncio
+import json
+import time
+from types import SimpleNamespace
+
+from executor import arun_tool_calls, run_tool_calls
+from registry import ToolRegistry
+
+
+def tool_call(call_id, name, arguments):
+    return SimpleNamespace(id=call_id, function=SimpleNamespace(name=name, arguments=arguments))
+
+
+def make_registry():
+    registry = ToolRegistry()
+
+    @registry.tool("Answer after a delay", seconds="Seconds to wait")
+    def slow(seconds: float):
+        time.sleep(seconds)
+        return f"slept {seconds}"
+
+    @registry.tool("Always fail")
+    def broken():
+        raise RuntimeError("boom")
+
+    return registry
+
+
+CALLS = [
+    tool_call("a", "slow", '{"seconds": 0.2}'),
+    tool_call("b", "broken", "{}"),
+    tool_call("c", "slow", '{"seconds": 0.01}'),
+    tool_call("d", "slow", '{"seconds": '),
+    tool_call("e", "missing", "{}"),
+]
+
+
+def check(messages):
+    assert [m["tool_call_id"] for m in messages] == ["a", "b", "c", "d", "e"]
+    assert all(m["role"] == "tool" for m in messages)
+    assert messages[0]["content"] == "slept 0.2"
+    assert messages[2]["content"] == "slept 0.01"
+    assert json.loads(messages[1]["content"]) == {"error": "Tool broken failed: boom"}
+    assert json.loads(messages[3]["content"]) == {"error": "Invalid JSON arguments for slow"}
+    assert json.loads(messages[4]["content"]) == {"error": "Unknown tool: missing"}
+
+
+def test_results_keep_call_order_and_errors_stay_per_call():
+    check(run_tool_calls(CALLS, make_registry()))
+
+
+def test_calls_run_concurrently():
+    calls = [tool_call(str(i), "slow", '{"seconds": 0.2}') for i in range(4)]
+    start = time.perf_counter()
+    run_tool_calls(calls, make_registry())
+    assert time.perf_counter() - start < 0.6
+
+
+def test_async_results_keep_call_order_and_errors_stay_per_call():
+    registry = make_registry()
+
+    async def aslow(seconds):
+        await asyncio.sleep(seconds)
+        return f"slept {seconds}"
+
+    async def abroken():
+        raise RuntimeError("boom")
+
+    bound = registry.bind({"slow": aslow, "broken": abroken})
+    check(asyncio.run(arun_tool_calls(CALLS, bound)))
+
+
+def test_no_tool_calls_give_no_messages():
+    assert run_tool_calls([], make_registry()) == []
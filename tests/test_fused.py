@@ -0,0 +1,89 @@
+import json
+from types import SimpleNamespace
+
+import fused
+import tools
+from cache import ToolCache
+from fused import plan, run_fused_tool_calls, split_results
+from local_tools import LOCAL_TOOLS
+
+
+def tool_call(call_id, name, args):
+    return SimpleNamespace(id=call_id, function=SimpleNamespace(name=name, arguments=json.dumps(args)))
+
+
+def completion(content):
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+def pending(*ids):
+    return [(SimpleNamespace(id=call_id), {}) for call_id in ids]
+
+
+def test_results_are_mapped_to_their_tool_calls():
+    content = json.dumps({"results": [
+        {"tool_call_id": "b", "result": {"joke": "ha"}},
+        {"tool_call_id": "a", "result": {"temperature": 20}},
+    ]})
+    assert split_results(content, pending("a", "b")) == {
+        "a": json.dumps({"temperature": 20}),
+        "b": json.dumps({"joke": "ha"}),
+    }
+
+
+def test_unusable_entries_are_left_out():
+    content = json.dumps({"results": [
+        {"tool_call_id": "a", "result": "not an object"},
+        {"tool_call_id": "unknown", "result": {}},
+        {"result": {"x": 1}},
+        "junk",
+        {"tool_call_id": "b", "result": {"ok": True}},
+    ]})
+    assert split_results(content, pending("a", "b")) == {"b": json.dumps({"ok": True})}
+
+
+def test_unparsable_responses_give_no_results():
+    assert split_results("not json", pending("a")) == {}
+    assert split_results(None, pending("a")) == {}
+    assert split_results(json.dumps([1, 2]), pending("a")) == {}
+    assert split_results(json.dumps({"results": {"a": {}}}), pending("a")) == {}
+
+
+def test_plan_runs_no_tools_and_reuses_cached_outputs(monkeypatch):
+    cache = ToolCache()
+    monkeypatch.setattr(fused, "tool_cache", cache)
+    ran = []
+    monkeypatch.setitem(LOCAL_TOOLS, "calculate_sum", lambda **args: ran.append(args))
+    news = {"topic": "AI"}
+    cache.set("get_news", news, tools.build_request("get_news", news), "cached headline")
+    calls = [
+        tool_call("s", "calculate_sum", {"a": 1, "b": 2}),
+        tool_call("n", "get_news", news),
+        tool_call("w", "get_current_weather", {"location": "Paris"}),
+        tool_call("t", "get_current_weather", {"location": "Rome"}),
+    ]
+    planned, outputs = plan(calls, tools.registry)
+    assert [call.id for call, _ in planned] == ["w", "t"]
+    assert outputs == {"n": "cached headline"}
+    assert ran == []
+    assert cache.stats() == {"hits": 1, "misses": 0}
+
+
+def test_cache_outcomes_are_counted_once(monkeypatch):
+    cache = ToolCache()
+    monkeypatch.setattr(fused, "tool_cache", cache)
+    monkeypatch.setattr(tools, "tool_cache", cache)
+
+    def create_completion(**kwargs):
+        if "response_format" in kwargs:  # the fused request only answers the weather call
+            return completion(json.dumps({"results": [{"tool_call_id": "w", "result": {"temperature": 20}}]}))
+        return completion('{"headline": "AI news"}')
+
+    monkeypatch.setattr(fused, "create_completion", create_completion)
+    monkeypatch.setattr(tools, "create_completion", create_completion)
+    calls = [tool_call("w", "get_current_weather", {"location": "Paris"}), tool_call("n", "get_news", {"topic": "AI"})]
+    messages = run_fused_tool_calls(calls, tools.registry)
+    assert [m["content"] for m in messages] == ['{"temperature": 20}', '{"headline": "AI news"}']
+    assert cache.stats() == {"hits": 0, "misses": 2}
+    assert run_fused_tool_calls(calls, tools.registry) == messages
+    assert cache.stats() == {"hits": 2, "misses": 2}
@@ -0,0 +1,95 @@
+import asyncio
+import time
+
+from hedging import Hedger
+
+
+def first_slow(seconds=0.5):
+    """A request whose first attempt is slow and every later one answers at once"""
+    attempts = []
+
+    def request():
+        attempts.append(time.perf_counter())
+        if len(attempts) == 1:
+            time.sleep(seconds)
+            return "slow"
+        return "fast"
+
+    return request, attempts
+
+
+def warm_up(hedger, key="get_time", times=1):
+    for _ in range(times):
+        hedger.call(key, lambda: None)
+
+
+def test_disabled_calls_directly():
+    hedger = Hedger(mode="off")
+    assert hedger.call("get_time", lambda: "answer") == "answer"
+    assert not Hedger(mode="tools").enabled("agent")
+    assert Hedger(mode="all").enabled("agent")
+    assert hedger.stats()["requests"] == 0
+
+
+def test_no_hedge_until_enough_latencies():
+    hedger = Hedger(mode="tools", percentile=0, max_extra=1, min_samples=3)
+    warm_up(hedger, times=2)
+    request, attempts = first_slow(0.05)
+    assert hedger.call("get_time", request) == "slow"
+    assert len(attempts) == 1
+    assert hedger.delay("get_time") is not None
+
+
+def test_duplicate_wins_over_slow_request():
+    hedger = Hedger(mode="tools", percentile=0, max_extra=1, min_samples=1)
+    warm_up(hedger)
+    request, attempts = first_slow()
+    start = time.perf_counter()
+    assert hedger.call("get_time", request) == "fast"
+    assert time.perf_counter() - start < 0.4
+    assert len(attempts) == 2
+    stats = hedger.stats()
+    assert (stats["fired"], stats["won"], stats["win_rate"]) == (1, 1, 1.0)
+
+
+def test_fast_request_is_not_hedged():
+    hedger = Hedger(mode="tools", percentile=100, max_extra=1, min_samples=1)
+    hedger.call("get_time", time.sleep, 0.2)
+    request, attempts = first_slow(0.0)
+    assert hedger.call("get_time", request) == "slow"
+    assert len(attempts) == 1
+    assert hedger.stats()["fired"] == 0
+
+
+def test_budget_caps_extra_requests():
+    hedger = Hedger(mode="tools", percentile=0, max_extra=0.25, min_samples=1)
+    warm_up(hedger)
+    for _ in range(3):
+        hedger.call("get_time", time.sleep, 0.02)
+    stats = hedger.stats()
+    assert (stats["requests"], stats["fired"], stats["over_budget"]) == (4, 1, 2)
+
+
+def test_async_loser_is_cancelled():
+    hedger = Hedger(mode="tools", percentile=0, max_extra=1, min_samples=1)
+    attempts = []
+    cancelled = []
+
+    async def request():
+        attempts.append(1)
+        if len(attempts) == 2:  # the first attempt is the warm-up
+            try:
+                await asyncio.sleep(1)
+            except asyncio.CancelledError:
+                cancelled.append(True)
+                raise
+            return "slow"
+        return "fast"
+
+    async def main():
+        await hedger.acall("get_time", request)
+        return await hedger.acall("get_time", request)
+
+    assert asyncio.run(main()) == "fast"
+    assert cancelled == [True]
+    assert hedger.stats()["won"] == 1
@@ -0,0 +1,54 @@
+import json
+
+from local_tools import calculate_sum, get_time, lookup_timezone
+
+
+def test_zone_cities_and_aliases_resolve():
+    assert lookup_timezone("Paris") == "Europe/Paris"
+    assert lookup_timezone("new york") == "America/New_York"
+    assert lookup_timezone("Chennai") == "Asia/Kolkata"
+    assert lookup_timezone("US/Eastern") == "US/Eastern"
+
+
+def test_links_are_not_matched_as_cities():
+    assert lookup_timezone("West") is None
+    assert lookup_timezone("Victoria") is None
+
+
+def test_qualifiers_for_another_zone_reject_the_city():
+    assert lookup_timezone("Paris, TX") is None
+    assert lookup_timezone("London, Ontario") is None
+    assert lookup_timezone("Perth, Scotland") is None
+    assert lookup_timezone("Melbourne, FL") is None
+    assert lookup_timezone("Victoria, BC") is None
+
+
+def test_state_and_country_qualifiers_confirm_the_city():
+    assert lookup_timezone("San Francisco, CA") == "America/Los_Angeles"
+    assert lookup_timezone("Seattle, WA") == "America/Los_Angeles"
+    assert lookup_timezone("New York, NY") == "America/New_York"
+    assert lookup_timezone("Perth, WA") == "Australia/Perth"
+    assert lookup_timezone("Sydney, Australia") == "Australia/Sydney"
+    assert lookup_timezone("Toronto, Canada") == "America/Toronto"
+    assert lookup_timezone("Tokyo, Japan") == "Asia/Tokyo"
+    assert lookup_timezone("London, UK") == "Europe/London"
+
+
+def test_unknown_qualifiers_are_ignored():
+    assert lookup_timezone("Paris, Ile-de-France") == "Europe/Paris"
+
+
+def test_unknown_cities_take_a_single_zone_qualifier():
+    assert lookup_timezone("Springfield, IL") == "America/Chicago"
+    assert lookup_timezone("Kingston, Jamaica") == "America/Jamaica"
+    assert lookup_timezone("Springfield, USA") is None
+
+
+def test_unknown_locations_defer_to_the_llm():
+    assert get_time("Paris, TX") is None
+    assert json.loads(get_time("Tokyo"))["location"] == "Tokyo"
+
+
+def test_calculate_sum_is_exact():
+    assert json.loads(calculate_sum(0.1, 0.2))["sum"] == 0.3
+    assert json.loads(calculate_sum(2, 3))["sum"] == 5
@@ -0,0 +1,99 @@
+import asyncio
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from groq import APIConnectionError, BadRequestError, InternalServerError, RateLimitError
+
+from pool import MIN_REQUESTS, ClientPool, Member
+
+REQUEST = httpx.Request("POST", "https://api.groq.com/openai/v1/chat/completions")
+
+
+def status_error(cls, status):
+    return cls("failed", response=httpx.Response(status, request=REQUEST), body=None)
+
+
+def member(name, answer):
+    """A member whose completions return `answer`, or raise it when it is an exception"""
+    member = Member(name, requests_per_minute=0, tokens_per_minute=0)
+    member.calls = 0
+
+    def create(**kwargs):
+        member.calls += 1
+        if isinstance(answer, Exception):
+            raise answer
+        return answer
+
+    async def acreate(**kwargs):
+        return create(**kwargs)
+
+    member._client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    member._async_client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=acreate)))
+    return member
+
+
+def test_retryable_error_fails_over_to_another_member():
+    down, up = member("down", status_error(InternalServerError, 500)), member("up", "ok")
+    pool = ClientPool([down, up], strategy="round-robin", max_retries=1)
+    assert pool.call(model="m") == "ok"
+    assert (down.calls, up.calls) == (1, 1)
+    stats = pool.stats()
+    assert stats["down"]["errors"] == 1 and stats["up"]["errors"] == 0
+    assert stats["down"]["in_flight"] == 0 and stats["up"]["in_flight"] == 0
+
+
+def test_async_fails_over_to_another_member():
+    down, up = member("down", APIConnectionError(request=REQUEST)), member("up", "ok")
+    pool = ClientPool([down, up], strategy="round-robin", max_retries=1)
+    assert asyncio.run(pool.acall(model="m")) == "ok"
+    assert (down.calls, up.calls) == (1, 1)
+
+
+def test_non_retryable_error_is_raised_at_once():
+    bad, up = member("bad", status_error(BadRequestError, 400)), member("up", "ok")
+    pool = ClientPool([bad, up], strategy="round-robin", max_retries=3)
+    with pytest.raises(BadRequestError):
+        pool.call(model="m")
+    assert up.calls == 0
+
+
+def test_failing_member_is_ejected_then_readmitted(clock):
+    down, up = member("down", APIConnectionError(request=REQUEST)), member("up", "ok")
+    pool = ClientPool([down, up], strategy="round-robin", eject_error_rate=0.5, eject_seconds=30, max_retries=0)
+    for _ in range(2 * MIN_REQUESTS):
+        try:
+            pool.call(model="m")
+        except APIConnectionError:
+            pass
+    assert down.calls == MIN_REQUESTS
+    assert pool.stats()["down"]["ejected"] and pool.stats()["down"]["ejections"] == 1
+    for _ in range(4):
+        assert pool.call(model="m") == "ok"
+    assert down.calls == MIN_REQUESTS
+    clock.advance(31)
+    assert not pool.stats()["down"]["ejected"]
+    assert {pool.pick(), pool.pick()} == {down, up}
+
+
+def test_rate_limits_do_not_eject(clock):
+    limited = member("limited", status_error(RateLimitError, 429))
+    pool = ClientPool([limited], eject_error_rate=0.5, max_retries=0)
+    for _ in range(2 * MIN_REQUESTS):
+        with pytest.raises(RateLimitError):
+            pool.call(model="m")
+    assert pool.stats()["limited"]["ejections"] == 0
+
+
+def test_every_member_ejected_picks_the_soonest_back(clock):
+    first, second = member("first", "ok"), member("second", "ok")
+    pool = ClientPool([first, second])
+    first.ejected_until = clock.now + 20
+    second.ejected_until = clock.now + 10
+    assert pool.pick() is second
+
+
+def test_member_model_overrides_request():
+    local = member("local", "ok")
+    local.model = "llama3"
+    assert local.request({"model": "llama3-70b-8192", "stream": False}) == {"model": "llama3", "stream": False}
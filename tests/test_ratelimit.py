@@ -0,0 +1,76 @@
+import httpx
+from groq import BadRequestError, RateLimitError
+
+from ratelimit import RateLimiter, TokenBucket, retry_after
+
+
+def status_error(cls, status, headers=None):
+    request = httpx.Request("POST", "https://api.groq.com/openai/v1/chat/completions")
+    response = httpx.Response(status, headers=headers or {}, request=request)
+    return cls("failed", response=response, body=None)
+
+
+def test_bucket_starts_full_then_makes_callers_wait(clock):
+    bucket = TokenBucket(60)
+    assert bucket.reserve(60) == 0.0
+    assert bucket.reserve(1) == 1.0
+    assert bucket.reserve(1) == 2.0  # queued behind the first waiter
+
+
+def test_bucket_refills_over_time_up_to_capacity(clock):
+    bucket = TokenBucket(60)
+    bucket.reserve(60)
+    clock.advance(30)
+    assert bucket.reserve(30) == 0.0
+    clock.advance(1000)
+    assert bucket.reserve(100) == 0.0  # one request never waits for more than a full bucket
+    assert bucket.reserve(1) == 1.0
+
+
+def test_refund_returns_unused_budget(clock):
+    bucket = TokenBucket(60)
+    bucket.reserve(60)
+    bucket.refund(30)
+    assert bucket.reserve(30) == 0.0
+
+
+def test_zero_rate_disables_the_bucket():
+    assert TokenBucket(0).reserve(10**9) == 0.0
+
+
+def test_retry_after_reads_milliseconds_first():
+    headers = {"retry-after-ms": "1500", "retry-after": "9"}
+    assert retry_after(status_error(RateLimitError, 429, headers)) == 1.5
+    assert retry_after(status_error(RateLimitError, 429, {"retry-after": "2"})) == 2.0
+
+
+def test_retry_after_ignores_missing_and_invalid_headers():
+    assert retry_after(ValueError("no response")) is None
+    assert retry_after(status_error(RateLimitError, 429)) is None
+    assert retry_after(status_error(RateLimitError, 429, {"retry-after": "soon"})) is None
+
+
+def test_retry_after_blocks_every_caller(clock):
+    limiter = RateLimiter(requests_per_minute=0, tokens_per_minute=0)
+    error = status_error(RateLimitError, 429, {"retry-after": "3"})
+    assert limiter._backoff(error, 0) == 3.0
+    assert limiter.blocked_until == clock.now + 3
+    assert limiter._acquire(100) == 3.0
+    clock.advance(3)
+    assert limiter._acquire(100) == 0.0
+
+
+def test_backoff_without_retry_after_is_jittered_exponential(clock):
+    limiter = RateLimiter(requests_per_minute=0, tokens_per_minute=0)
+    delay = limiter._backoff(status_error(RateLimitError, 429), 2)
+    assert 0 <= delay <= 2.0
+    assert limiter.blocked_until == 0.0
+
+
+def test_errors_that_are_not_retried():
+    limiter = RateLimiter(requests_per_minute=0, tokens_per_minute=0, max_retries=2)
+    assert limiter._backoff(status_error(BadRequestError, 400), 0) is None
+    assert limiter._backoff(status_error(RateLimitError, 429), 2) is None
+    limiter.retry_budget = 0.5
+    assert limiter._backoff(status_error(RateLimitError, 429), 0) is None
+    assert limiter.retries == 0
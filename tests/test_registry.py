@@ -0,0 +1,55 @@
+from typing import Optional
+
+import pytest
+
+from registry import ToolArgumentError, ToolRegistry, build_schema
+
+
+def get_weather(location: str, days: int = 1, metric: Optional[bool] = None):
+    return f"{location} {days} {metric}"
+
+
+def test_schema_follows_the_signature():
+    schema = build_schema(get_weather, "Get the weather", {"location": "The city"})
+    assert schema["function"]["name"] == "get_weather"
+    assert schema["function"]["description"] == "Get the weather"
+    parameters = schema["function"]["parameters"]
+    assert parameters["properties"] == {
+        "location": {"type": "string", "description": "The city"},
+        "days": {"type": "integer", "description": "days"},
+        "metric": {"type": "boolean", "description": "metric"},
+    }
+    assert parameters["required"] == ["location"]
+
+
+def test_unsupported_annotations_are_rejected():
+    def tool(point: tuple):
+        pass
+
+    with pytest.raises(TypeError):
+        build_schema(tool, "A tool", {})
+
+
+@pytest.fixture
+def registry():
+    registry = ToolRegistry()
+    registry.tool("Get the weather", location="The city")(get_weather)
+    return registry
+
+
+@pytest.mark.parametrize("name, args, message", [
+    ("get_news", {}, "Unknown tool: get_news"),
+    ("get_weather", ["Paris"], "must be a JSON object"),
+    ("get_weather", {"location": "Paris", "units": "C"}, "Unexpected arguments for get_weather: units"),
+    ("get_weather", {"days": 2}, "Missing arguments for get_weather: location"),
+    ("get_weather", {"location": 42}, "'location' of get_weather must be of type string"),
+    ("get_weather", {"location": "Paris", "days": True}, "'days' of get_weather must be of type integer"),
+])
+def test_invalid_arguments_raise(registry, name, args, message):
+    with pytest.raises(ToolArgumentError, match=message):
+        registry.validate(name, args)
+
+
+def test_valid_arguments_reach_the_tool(registry):
+    assert registry.call("get_weather", {"location": "Paris", "days": 2}) == "Paris 2 None"
+    assert registry.names == ["get_weather"]
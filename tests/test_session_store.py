@@ -0,0 +1,55 @@
+from session_store import SessionStore, entry_size, get_session_store
+
+
+def test_evicts_oldest_past_max_entries():
+    store = SessionStore(max_entries=2)
+    for key in "abc":
+        store.put(key, key.upper())
+    assert store.values() == ["B", "C"]
+    assert store.get("a") is None
+    assert store.evictions == 1
+
+
+def test_evicts_oldest_past_max_bytes():
+    value = "x" * 100
+    store = SessionStore(max_bytes=2 * entry_size(value))
+    for key in "abc":
+        store.put(key, value)
+    assert len(store) == 2
+    assert store.bytes == 2 * entry_size(value)
+    assert store.last() == value
+
+
+def test_newest_is_kept_even_when_too_big():
+    store = SessionStore(max_bytes=10)
+    store.put("a", "small")
+    store.put("b", "x" * 100)
+    assert store.values() == ["x" * 100]
+    assert store.evictions == 1
+
+
+def test_put_again_moves_key_to_newest():
+    store = SessionStore(max_entries=2)
+    store.put("a", 1)
+    store.put("b", 2)
+    store.put("a", 3)
+    store.put("c", 4)
+    assert store.values() == [3, 4]
+    assert store.bytes == entry_size(3) + entry_size(4)
+
+
+def test_pop_and_clear_keep_size_in_step():
+    store = SessionStore()
+    store.put("a", "value")
+    assert store.pop("a") == "value"
+    assert store.pop("a") is None
+    assert store.bytes == 0
+    store.put("b", "value")
+    store.clear()
+    assert len(store) == 0 and store.bytes == 0 and store.last() is None
+
+
+def test_get_session_store_creates_once():
+    state = {}
+    store = get_session_store(state, "results")
+    assert get_session_store(state, "results") is store
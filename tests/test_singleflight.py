@@ -0,0 +1,73 @@
+import asyncio
+import threading
+
+import pytest
+
+from singleflight import SingleFlight
+
+
+def test_do_shares_the_leaders_error_with_waiting_callers():
+    flight = SingleFlight()
+    release = threading.Event()
+    errors = []
+
+    def fail():
+        release.wait(5)
+        raise ValueError("upstream failed")
+
+    def call():
+        try:
+            flight.do("key", fail)
+        except ValueError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=call) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    while flight.stats()["collapsed"] < 2:
+        threading.Event().wait(0.01)
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert len(errors) == 3 and len({id(e) for e in errors}) == 1
+    assert flight.stats()["executed"] == 1
+
+
+def test_do_runs_again_after_a_failure():
+    flight = SingleFlight()
+    with pytest.raises(ValueError):
+        flight.do("key", int, "not a number")
+    assert flight.do("key", int, "7") == (7, False)
+
+
+def test_ado_shares_the_leaders_error_with_waiting_callers():
+    flight = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ValueError("upstream failed")
+
+    async def main():
+        return await asyncio.gather(*(flight.ado("key", fail) for _ in range(3)), return_exceptions=True)
+
+    errors = asyncio.run(main())
+    assert all(isinstance(e, ValueError) for e in errors)
+    assert flight.stats() == {"executed": 1, "collapsed": 2, "collapse_rate": 2 / 3}
+
+
+def test_ado_followers_run_themselves_when_the_leader_is_cancelled():
+    flight = SingleFlight()
+
+    async def slow():
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def main():
+        leader = asyncio.ensure_future(flight.ado("key", slow))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(flight.ado("key", slow))
+        await asyncio.sleep(0)
+        leader.cancel()
+        return await follower
+
+    assert asyncio.run(main()) == ("done", False)
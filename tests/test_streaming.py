@@ -0,0 +1,113 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from deadline import DeadlineExceeded, deadline
+from streaming import acollect_stream, collect_stream
+
+
+def chunk(content=None, tool_calls=None):
+    delta = SimpleNamespace(content=content, tool_calls=tool_calls)
+    return SimpleNamespace(choices=[SimpleNamespace(delta=delta)], x_groq=None)
+
+
+class Stream:
+    """A sync stream of chunks that takes `gap` seconds of the clock between them"""
+
+    def __init__(self, chunks, clock, gap):
+        self.chunks = chunks
+        self.clock = clock
+        self.gap = gap
+        self.closed = False
+
+    def __iter__(self):
+        for item in self.chunks:
+            yield item
+            self.clock.advance(self.gap)
+
+    def close(self):
+        self.closed = True
+
+
+class AsyncStream:
+    def __init__(self, chunks, gap):
+        self.chunks = chunks
+        self.gap = gap
+        self.closed = False
+
+    async def __aiter__(self):
+        for item in self.chunks:
+            yield item
+            await asyncio.sleep(self.gap)
+
+    async def close(self):
+        self.closed = True
+
+
+def test_stream_is_closed_once_the_deadline_passes(clock):
+    stream = Stream([chunk("It "), chunk("is "), chunk("sunny.")], clock, gap=2)
+    tokens = []
+    with deadline(3), pytest.raises(DeadlineExceeded):
+        collect_stream(stream, tokens.append)
+    assert stream.closed
+    assert tokens == ["It ", "is "]
+
+
+def test_stream_within_the_deadline_is_collected(clock):
+    stream = Stream([chunk("It "), chunk("is "), chunk("sunny.")], clock, gap=1)
+    with deadline(10):
+        message = collect_stream(stream)
+    assert message.content == "It is sunny."
+    assert not stream.closed
+
+
+def test_async_stream_stops_waiting_at_the_deadline():
+    stream = AsyncStream([chunk("It "), chunk("is "), chunk("sunny.")], gap=5)
+
+    async def main():
+        with deadline(0.05):
+            await acollect_stream(stream)
+
+    with pytest.raises(DeadlineExceeded):
+        asyncio.run(main())
+    assert stream.closed
+
+
+def tool_delta(index, call_id=None, name=None, arguments=None):
+    function = SimpleNamespace(name=name, arguments=arguments)
+    return SimpleNamespace(index=index, id=call_id, function=function)
+
+
+def test_tool_call_deltas_are_merged_by_index():
+    chunks = [
+        chunk(tool_calls=[tool_delta(0, "call_a", "get_weather", "")]),
+        chunk(tool_calls=[tool_delta(0, arguments='{"location": '), tool_delta(1, "call_b", "get_time", '{"loc')]),
+        chunk(tool_calls=[tool_delta(1, arguments='ation": "Tokyo"}')]),
+        chunk(tool_calls=[tool_delta(0, arguments='"Paris"}')]),
+    ]
+    message = collect_stream(chunks)
+    assert message.content is None
+    assert [(c.id, c.function.name, c.function.arguments) for c in message.tool_calls] == [
+        ("call_a", "get_weather", '{"location": "Paris"}'),
+        ("call_b", "get_time", '{"location": "Tokyo"}'),
+    ]
+
+
+def test_content_is_forwarded_as_it_arrives():
+    tokens = []
+    message = collect_stream([chunk("Hel"), chunk("lo"), chunk(None)], tokens.append)
+    assert tokens == ["Hel", "lo"]
+    assert message.content == "Hello"
+    assert message.tool_calls is None
+
+
+def test_async_stream_merges_the_same_way():
+    chunks = [chunk("Hi"), chunk(tool_calls=[tool_delta(0, "call_a", "get_joke", "{}")])]
+
+    async def main():
+        return await acollect_stream(AsyncStream(chunks, gap=0))
+
+    message = asyncio.run(main())
+    assert message.content == "Hi"
+    assert message.tool_calls[0].function.name == "get_joke"
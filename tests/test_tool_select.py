@@ -0,0 +1,67 @@
+import pytest
+
+from registry import ToolRegistry
+from tool_select import select_tools, terms
+from tools import registry
+
+
+def names(schemas):
+    return [schema["function"]["name"] for schema in schemas]
+
+
+def user(content):
+    return {"role": "user", "content": content}
+
+
+def test_terms_drop_stop_words_and_endings():
+    assert terms("What's the weather forecast for the next days?") == ["weather", "forecast", "next", "day"]
+    assert terms("Adding glass") == ["add", "glass"]
+
+
+@pytest.mark.parametrize("prompt, expected", [
+    ("weather in Paris", ["get_current_weather"]),
+    ("tell me a joke", ["get_joke"]),
+    ("add 5 and 7", ["calculate_sum"]),
+    ("time in Tokyo and a quote", ["get_time", "get_quote"]),
+])
+def test_selects_matching_tools(prompt, expected):
+    assert names(select_tools([user(prompt)], registry, top_k=2)) == expected
+
+
+def test_off_or_unsure_sends_every_tool():
+    assert select_tools([user("weather in Paris")], registry, top_k=0) is registry.schemas
+    assert select_tools([user("hello there")], registry, top_k=2) is registry.schemas
+
+
+def test_too_many_confident_matches_send_every_tool():
+    prompt = "weather in Paris, the time in Tokyo, a joke and a quote"
+    assert select_tools([user(prompt)], registry, top_k=2) is registry.schemas
+
+
+def test_tools_already_called_stay_selected():
+    messages = [
+        user("weather in Paris"),
+        {"role": "assistant", "content": None, "tool_calls": [
+            {"id": "1", "type": "function", "function": {"name": "get_joke", "arguments": "{}"}},
+        ]},
+        {"role": "tool", "tool_call_id": "1", "content": "A joke"},
+    ]
+    assert names(select_tools(messages, registry, top_k=1)) == ["get_current_weather", "get_joke"]
+
+
+def test_keywords_count_towards_the_match():
+    tools = ToolRegistry()
+
+    @tools.tool("Look up a value", keywords=("stock", "ticker"))
+    def lookup(key: str):
+        return key
+
+    @tools.tool("Convert between units")
+    def convert(value: float):
+        return value
+
+    @tools.tool("Translate text")
+    def translate(text: str):
+        return text
+
+    assert names(select_tools([user("stock price of ACME")], tools, top_k=1)) == ["lookup"]
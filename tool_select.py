@@ -0,0 +1,92 @@
+import math
+import os
+import re
+from collections import Counter
+from functools import lru_cache
+
+from compaction import as_dict
+from tracing import annotate
+
+# Send only the k tools that best match the conversation; 0 sends every tool
+TOOL_SELECTION_TOP_K = int(os.getenv("TOOL_SELECTION_TOP_K", "0"))
+# Cosine score the best tool must reach, or every tool is sent
+TOOL_SELECTION_MIN_SCORE = float(os.getenv("TOOL_SELECTION_MIN_SCORE", "0.15"))
+
+STOP_WORDS = {
+    "a", "an", "the", "and", "or", "of", "in", "on", "at", "to", "for", "from", "with", "by", "about", "is",
+    "are", "be", "it", "its", "me", "my", "i", "you", "your", "what", "whats", "how", "can", "could", "please",
+    "tell", "give", "get", "show", "some", "given", "e", "g", "current", "two",
+}
+
+
+def terms(text):
+    """Lowercased words without stop words, with plural and -ing endings stripped"""
+    words = []
+    for word in re.findall(r"[a-z]+", re.sub(r"['’]", "", text.lower())):
+        if word in STOP_WORDS:
+            continue
+        for suffix in ("ing", "s"):
+            if word.endswith(suffix) and not word.endswith("ss") and len(word) - len(suffix) >= 3:
+                word = word[:-len(suffix)]
+                break
+        words.append(word)
+    return words
+
+
+def _document(schema, keywords):
+    function = schema["function"]
+    parameters = function["parameters"]["properties"]
+    parts = [function["name"].replace("_", " "), function["description"], *keywords]
+    parts += [f"{name} {spec.get('description', '')}" for name, spec in parameters.items()]
+    return " ".join(parts)
+
+
+class ToolIndex:
+    """TF-IDF index over tool names, descriptions, parameter descriptions and keywords"""
+
+    def __init__(self, schemas, keywords=None):
+        self.schemas = schemas
+        counts = [Counter(terms(_document(s, (keywords or {}).get(s["function"]["name"], ())))) for s in schemas]
+        df = Counter(term for count in counts for term in count)
+        self.idf = {term: math.log((1 + len(schemas)) / (1 + n)) + 1 for term, n in df.items()}
+        self.vectors = [self._normalize({t: n * self.idf[t] for t, n in count.items()}) for count in counts]
+
+    @staticmethod
+    def _normalize(vector):
+        norm = math.sqrt(sum(v * v for v in vector.values())) or 1.0
+        return {t: v / norm for t, v in vector.items()}
+
+    def scores(self, text):
+        """Cosine similarity of `text` to every tool, in schema order"""
+        query = self._normalize({t: n * self.idf[t] for t, n in Counter(terms(text)).items() if t in self.idf})
+        return [sum(weight * vector.get(t, 0.0) for t, weight in query.items()) for vector in self.vectors]
+
+
+@lru_cache(maxsize=None)
+def tool_index(registry):
+    return ToolIndex(registry.schemas, registry.keywords)
+
+
+def select_tools(messages, registry, top_k=TOOL_SELECTION_TOP_K, min_score=TOOL_SELECTION_MIN_SCORE):
+    """Tool schemas to send with the next agent completion.
+
+    The user messages are scored against the tool index, and the `top_k`
+    best tools plus any tool already called in the conversation are sent.
+    Every tool is sent instead when selection is off or not confident: the
+    best score is under `min_score`, or more than `top_k` tools reach it.
+    """
+    schemas = registry.schemas
+    if not top_k or top_k >= len(schemas):
+        return schemas
+    messages = [as_dict(m) for m in messages]
+    query = " ".join(str(m.get("content") or "") for m in messages if m.get("role") == "user")
+    scores = tool_index(registry).scores(query)
+    ranked = sorted(range(len(schemas)), key=lambda i: -scores[i])
+    if scores[ranked[0]] < min_score or scores[ranked[top_k]] >= min_score:
+        annotate(tools_selected=len(schemas), tool_selection="all")
+        return schemas
+    called = {call["function"]["name"] for m in messages for call in m.get("tool_calls") or []}
+    chosen = {i for i in ranked[:top_k] if scores[i] > 0}
+    chosen |= {i for i, s in enumerate(schemas) if s["function"]["name"] in called}
+    annotate(tools_selected=len(chosen), tool_selection="top_k")
+    return [schemas[i] for i in sorted(chosen)]
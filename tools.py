@@ -1,216 +1,167 @@
 import os
 import json
-from dotenv import load_dotenv
 
-load_dotenv()
+from cache import tool_cache
+from client import create_completion
+from hedging import hedger
+from local_tools import LOCAL_TOOLS
+from registry import ToolRegistry
+from routing import MODEL, route
+from singleflight import COALESCE_TOOLS, tool_flight
+from tracing import annotate
 
-from groq import Groq
+# "local" answers deterministic tools in-process; "llm" sends every tool to the model
+TOOL_EXECUTION = os.getenv("TOOL_EXECUTION", "local")
 
-client = Groq(
-    api_key=os.getenv("GROQ_API_KEY"),
-)
-
-# Get the current weather
-def get_current_weather(location):
-    """Get the current weather in a given location (LLM synthetic)"""
-    prompt = f"""
+# Prompt template and sampling settings for each synthetic tool
+TOOL_PROMPTS = {
+    "get_current_weather": {
+        "prompt": """
     You are a weather API. Given the location '{location}', respond with a JSON object with keys 'location' and 'temperature' (in Fahrenheit) for that location. Make the temperature realistic for the location, but you can make it up.
-    """
+    """,
+        "temperature": 0.7,
+        "max_tokens": 100,
+        "error": "Failed to get weather",
+    },
+    "get_time": {
+        "prompt": """
+    You are a time API. Given the location '{location}', respond with a JSON object with keys 'location' and 'time' (in 12-hour format, e.g., '3:45 PM') for the current local time in that location. Make up a plausible time.
+    """,
+        "temperature": 0.7,
+        "max_tokens": 60,
+        "error": "Failed to get time",
+    },
+    "get_news": {
+        "prompt": """
+    You are a news API. Given the topic '{topic}', respond with a JSON object with keys 'topic' and 'headline' where 'headline' is a plausible, recent-sounding news headline about the topic.
+    """,
+        "temperature": 0.7,
+        "max_tokens": 80,
+        "error": "Failed to get news",
+    },
+    "calculate_sum": {
+        "prompt": """
+    You are a math API. Given the numbers a={a} and b={b}, respond with a JSON object with keys 'a', 'b', and 'sum' (where 'sum' is the sum of a and b).
+    """,
+        "temperature": 0,
+        "max_tokens": 60,
+        "error": "Failed to calculate sum",
+    },
+    "get_joke": {
+        "prompt": "You are a joke API. Respond with a JSON object with a single key 'joke' and a value that is a short, funny joke.",
+        "temperature": 0.9,
+        "max_tokens": 60,
+        "error": "Failed to get joke",
+    },
+    "get_quote": {
+        "prompt": "You are a quote API. Respond with a JSON object with a single key 'quote' and a value that is a short, inspirational quote.",
+        "temperature": 0.8,
+        "max_tokens": 60,
+        "error": "Failed to get quote",
+    },
+}
+
+
+def build_request(name, args):
+    """Build the chat completion kwargs for a synthetic tool call"""
+    spec = TOOL_PROMPTS[name]
+    settings = route("tools", name, {
+        "model": MODEL,
+        "temperature": spec["temperature"],
+        "max_tokens": spec["max_tokens"],
+    })
+    return {"messages": [{"role": "user", "content": spec["prompt"].format(**args)}], **settings}
+
+
+def error_result(name, e):
+    return json.dumps({"error": f"{TOOL_PROMPTS[name]['error']}: {str(e)}"})
+
+
+def is_local(name):
+    """Whether calls to a tool are answered in-process first"""
+    return TOOL_EXECUTION == "local" and name in LOCAL_TOOLS
+
+
+def run_local(name, args):
+    """Return the local result for a tool, or None when the LLM must answer"""
+    if not is_local(name):
+        return None
     try:
-        response = client.chat.completions.create(
-            model="llama3-70b-8192",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.7,
-            max_tokens=100,
-        )
-        content = response.choices[0].message.content
-        return content
+        return LOCAL_TOOLS[name](**args)
     except Exception as e:
-        return json.dumps({"error": f"Failed to get weather: {str(e)}"})
+        return error_result(name, e)
 
-# Additional tools
 
-def get_time(location):
-    """Get the current time in a given location (LLM synthetic)"""
-    prompt = f"""
-    You are a time API. Given the location '{location}', respond with a JSON object with keys 'location' and 'time' (in 12-hour format, e.g., '3:45 PM') for the current local time in that location. Make up a plausible time.
-    """
+def _fetch(name, args, request):
+    response = hedger.call(name, create_completion, **request)
+    content = response.choices[0].message.content
+    tool_cache.set(name, args, request, content)
+    return content
+
+
+def _complete(name, **args):
+    local = run_local(name, args)
+    if local is not None:
+        annotate(cache="local")
+        return local
+    request = build_request(name, args)
+    cached = tool_cache.get(name, args, request)
+    annotate(cache=tool_cache.status(name, cached))
+    if cached is not None:
+        return cached
     try:
-        response = client.chat.completions.create(
-            model="llama3-70b-8192",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.7,
-            max_tokens=60,
-        )
-        content = response.choices[0].message.content
+        if name not in COALESCE_TOOLS:
+            return _fetch(name, args, request)
+        # Identical calls already in flight share that completion
+        content, shared = tool_flight.do(tool_cache.key(name, args, request), _fetch, name, args, request)
+        annotate(coalesced=shared)
         return content
     except Exception as e:
-        return json.dumps({"error": f"Failed to get time: {str(e)}"})
+        return error_result(name, e)
+
+registry = ToolRegistry()
 
-def get_news(topic):
+# Get the current weather
+@registry.tool(
+    "Get the current weather in a given location",
+    keywords=("temperature", "forecast", "rain", "hot", "cold"),
+    location="The city and state, e.g. San Francisco, CA")
+def get_current_weather(location: str):
+    """Get the current weather in a given location (LLM synthetic)"""
+    return _complete("get_current_weather", location=location)
+
+# Additional tools
+
+@registry.tool(
+    "Get the current time in a given location",
+    keywords=("clock", "hour", "timezone"),
+    location="The city and state, e.g. San Francisco, CA")
+def get_time(location: str):
+    """Get the current time in a given location (local when the zone is known, else LLM synthetic)"""
+    return _complete("get_time", location=location)
+
+@registry.tool(
+    "Get the latest news about a topic", keywords=("headline", "happening", "update"), topic="The topic to get news about")
+def get_news(topic: str):
     """Get the latest news about a topic (LLM synthetic)"""
-    prompt = f"""
-    You are a news API. Given the topic '{topic}', respond with a JSON object with keys 'topic' and 'headline' where 'headline' is a plausible, recent-sounding news headline about the topic.
-    """
-    try:
-        response = client.chat.completions.create(
-            model="llama3-70b-8192",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.7,
-            max_tokens=80,
-        )
-        content = response.choices[0].message.content
-        return content
-    except Exception as e:
-        return json.dumps({"error": f"Failed to get news: {str(e)}"})
+    return _complete("get_news", topic=topic)
 
-def calculate_sum(a, b):
-    """Calculate the sum of two numbers (LLM synthetic)"""
-    prompt = f"""
-    You are a math API. Given the numbers a={a} and b={b}, respond with a JSON object with keys 'a', 'b', and 'sum' (where 'sum' is the sum of a and b).
-    """
-    try:
-        response = client.chat.completions.create(
-            model="llama3-70b-8192",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0,
-            max_tokens=60,
-        )
-        content = response.choices[0].message.content
-        return content
-    except Exception as e:
-        return json.dumps({"error": f"Failed to calculate sum: {str(e)}"})
+@registry.tool(
+    "Calculate the sum of two numbers", keywords=("add", "plus", "total", "math"), a="First number", b="Second number")
+def calculate_sum(a: float, b: float):
+    """Calculate the sum of two numbers (local, LLM synthetic with TOOL_EXECUTION=llm)"""
+    return _complete("calculate_sum", a=a, b=b)
 
+@registry.tool("Get a random joke", keywords=("funny", "laugh", "humor"))
 def get_joke():
     """Get a random joke (LLM synthetic)"""
-    prompt = "You are a joke API. Respond with a JSON object with a single key 'joke' and a value that is a short, funny joke."
-    try:
-        response = client.chat.completions.create(
-            model="llama3-70b-8192",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.9,
-            max_tokens=60,
-        )
-        content = response.choices[0].message.content
-        return content
-    except Exception as e:
-        return json.dumps({"error": f"Failed to get joke: {str(e)}"})
+    return _complete("get_joke")
 
+@registry.tool("Get a random inspirational quote", keywords=("motivation", "motivational", "saying", "wisdom"))
 def get_quote():
     """Get a random inspirational quote (LLM synthetic)"""
-    prompt = "You are a quote API. Respond with a JSON object with a single key 'quote' and a value that is a short, inspirational quote."
-    try:
-        response = client.chat.completions.create(
-            model="llama3-70b-8192",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.8,
-            max_tokens=60,
-        )
-        content = response.choices[0].message.content
-        return content
-    except Exception as e:
-        return json.dumps({"error": f"Failed to get quote: {str(e)}"})
-
-
-
-
-# Define a function for LLM to use as a tool
-tools = [
-    {
-        "type": "function",
-        "function": {
-            "name": "get_current_weather",
-            "description": "Get the current weather in a given location",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "location": {
-                        "type": "string",
-                        "description": "The city and state, e.g. San Francisco, CA",
-                    }
-                },
-                "required": ["location"],
-            },
-        },   
-    },
-    {
-        "type": "function",
-        "function": {
-            "name": "get_time",
-            "description": "Get the current time in a given location",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "location": {
-                        "type": "string",
-                        "description": "The city and state, e.g. San Francisco, CA",
-                    }
-                },
-                "required": ["location"],
-            },
-        },
-    },
-    {
-        "type": "function",
-        "function": {
-            "name": "get_news",
-            "description": "Get the latest news about a topic",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "topic": {
-                        "type": "string",
-                        "description": "The topic to get news about",
-                    }
-                },
-                "required": ["topic"],
-            },
-        },
-    },
-    {
-        "type": "function",
-        "function": {
-            "name": "calculate_sum",
-            "description": "Calculate the sum of two numbers",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "a": {
-                        "type": "number",
-                        "description": "First number",
-                    },
-                    "b": {
-                        "type": "number",
-                        "description": "Second number",
-                    }
-                },
-                "required": ["a", "b"],
-            },
-        },
-    },
-    {
-        "type": "function",
-        "function": {
-            "name": "get_joke",
-            "description": "Get a random joke",
-            "parameters": {
-                "type": "object",
-                "properties": {},
-                "required": [],
-            },
-        },
-    },
-    {
-        "type": "function",
-        "function": {
-            "name": "get_quote",
-            "description": "Get a random inspirational quote",
-            "parameters": {
-                "type": "object",
-                "properties": {},
-                "required": [],
-            },
-        },
-    },
-]
+    return _complete("get_quote")
+
 
+# Schemas for the LLM are generated from the registered tools above
+tools = registry.schemas
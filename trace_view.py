@@ -0,0 +1,61 @@
+import json
+
+import streamlit as st
+
+
+def _label(span):
+    if span.name == "tool":
+        return f"tool {span.attributes.get('tool')}"
+    if span.name == "agent.step":
+        return f"step {span.attributes.get('step')}"
+    return span.name
+
+
+def show_trace(trace):
+    """Render a trace in the sidebar as a waterfall, with export buttons"""
+    spans = trace.ordered_spans()
+    totals = trace.totals()
+    rows = [
+        {
+            "row": f"{i:02d} {_label(span)}",
+            "span": _label(span),
+            "start_ms": round((span.start - trace.start) / 1e6, 1),
+            "end_ms": round((span.start - trace.start) / 1e6 + span.duration * 1000, 1),
+            "duration_ms": round(span.duration * 1000, 1),
+            **{k: v for k, v in span.attributes.items() if k not in ("tool", "step")},
+        }
+        for i, span in enumerate(spans)
+    ]
+
+    with st.sidebar:
+        st.subheader("Trace")
+        st.caption(
+            f"{totals['duration'] * 1000:.0f} ms · {totals['llm_requests']} LLM requests · "
+            f"{totals['tool_calls']} tool calls · "
+            f"{totals['prompt_tokens']} prompt / {totals['completion_tokens']} completion tokens"
+        )
+        st.vega_lite_chart(
+            {
+                "data": {"values": rows},
+                "mark": {"type": "bar", "tooltip": True},
+                "encoding": {
+                    "y": {"field": "row", "type": "nominal", "sort": None, "title": None},
+                    "x": {"field": "start_ms", "type": "quantitative", "title": "ms"},
+                    "x2": {"field": "end_ms"},
+                    "color": {"field": "span", "type": "nominal", "legend": None},
+                },
+            },
+        )
+        st.dataframe(rows, hide_index=True)
+        st.download_button(
+            "Download spans (JSON lines)",
+            trace.to_jsonl(),
+            file_name=f"trace-{trace.trace_id}.jsonl",
+            mime="application/jsonl",
+        )
+        st.download_button(
+            "Download OTLP JSON",
+            json.dumps(trace.to_otlp()),
+            file_name=f"trace-{trace.trace_id}.json",
+            mime="application/json",
+        )
@@ -0,0 +1,187 @@
+import contextvars
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+# Append every finished trace to this JSON lines file when set
+TRACE_FILE = os.getenv("TRACE_FILE")
+
+_current_trace = contextvars.ContextVar("current_trace", default=None)
+_current_span = contextvars.ContextVar("current_span", default=None)
+
+
+class Span:
+    """A timed operation within a trace, such as one completion or tool call"""
+
+    def __init__(self, trace, name, parent_id, attributes):
+        self.trace = trace
+        self.name = name
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.attributes = dict(attributes)
+        self.status = "ok"
+        self.start = trace.now()
+        self.end = None
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def add(self, key, amount=1):
+        self.attributes[key] = self.attributes.get(key, 0) + amount
+
+    @property
+    def duration(self):
+        """Duration in seconds (so far, if the span is still open)"""
+        return ((self.end or self.trace.now()) - self.start) / 1e9
+
+    def to_dict(self):
+        return {
+            "trace_id": self.trace.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start": (self.start - self.trace.start) / 1e9,
+            "duration": self.duration,
+            "status": self.status,
+            "attributes": self.attributes,
+        }
+
+
+class _NoSpan:
+    """Stand-in returned by `span()` when no trace is active"""
+
+    def set(self, **attributes):
+        pass
+
+    def add(self, key, amount=1):
+        pass
+
+
+NO_SPAN = _NoSpan()
+
+
+class Trace:
+    """All spans recorded for one agent run"""
+
+    def __init__(self, name):
+        self.name = name
+        self.trace_id = uuid.uuid4().hex
+        self._unix_ns = time.time_ns()
+        self._perf_ns = time.perf_counter_ns()
+        self.start = self._unix_ns
+        self.spans = []
+        self._lock = threading.Lock()
+
+    def now(self):
+        """Wall clock in nanoseconds, measured with the monotonic clock"""
+        return self._unix_ns + time.perf_counter_ns() - self._perf_ns
+
+    def add(self, span):
+        with self._lock:
+            self.spans.append(span)
+
+    def ordered_spans(self):
+        return sorted(self.spans, key=lambda span: span.start)
+
+    def totals(self):
+        """Token counts and time summed over the trace"""
+        totals = {"prompt_tokens": 0, "completion_tokens": 0, "llm_requests": 0, "tool_calls": 0}
+        for span in self.spans:
+            totals["prompt_tokens"] += span.attributes.get("prompt_tokens", 0)
+            totals["completion_tokens"] += span.attributes.get("completion_tokens", 0)
+            totals["llm_requests"] += span.name == "llm.request"
+            totals["tool_calls"] += span.name == "tool"
+            totals["tool_calls"] += span.attributes.get("fused", 0) if span.name == "tool.fused" else 0
+        roots = [span for span in self.spans if span.parent_id is None]
+        totals["duration"] = sum(span.duration for span in roots)
+        return totals
+
+    def to_jsonl(self):
+        return "".join(json.dumps(span.to_dict()) + "\n" for span in self.ordered_spans())
+
+    def to_otlp(self):
+        """The trace in the OpenTelemetry OTLP/JSON format"""
+        def value(v):
+            if isinstance(v, bool):
+                return {"boolValue": v}
+            if isinstance(v, int):
+                return {"intValue": str(v)}
+            if isinstance(v, float):
+                return {"doubleValue": v}
+            return {"stringValue": str(v)}
+
+        spans = [
+            {
+                "traceId": self.trace_id,
+                "spanId": span.span_id,
+                "parentSpanId": span.parent_id or "",
+                "name": span.name,
+                "kind": 1,
+                "startTimeUnixNano": str(span.start),
+                "endTimeUnixNano": str(span.end or self.now()),
+                "attributes": [{"key": k, "value": value(v)} for k, v in span.attributes.items()],
+                "status": {"code": 2 if span.status == "error" else 1},
+            }
+            for span in self.ordered_spans()
+        ]
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": "function-call-llm"}}]},
+                "scopeSpans": [{"scope": {"name": "tracing"}, "spans": spans}],
+            }]
+        }
+
+
+@contextmanager
+def span(name, **attributes):
+    """Record a span for the enclosed block under the current trace, if any"""
+    trace = _current_trace.get()
+    if trace is None:
+        yield NO_SPAN
+        return
+    parent = _current_span.get()
+    current = Span(trace, name, parent.span_id if parent else None, attributes)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.status = "error"
+        current.set(error=str(e) or type(e).__name__)
+        raise
+    finally:
+        current.end = trace.now()
+        _current_span.reset(token)
+        trace.add(current)
+
+
+@contextmanager
+def start_trace(name="agent"):
+    """Collect the spans of the enclosed block into a new Trace"""
+    trace = Trace(name)
+    token = _current_trace.set(trace)
+    try:
+        with span(name):
+            yield trace
+    finally:
+        _current_trace.reset(token)
+        if TRACE_FILE:
+            with open(TRACE_FILE, "a") as f:
+                f.write(trace.to_jsonl())
+
+
+def current_span():
+    return _current_span.get() or NO_SPAN
+
+
+def annotate(**attributes):
+    """Set attributes on the innermost open span"""
+    current_span().set(**attributes)
+
+
+def record_usage(usage):
+    """Copy token counts from a completion's `usage` onto the current span"""
+    if usage is not None:
+        annotate(prompt_tokens=usage.prompt_tokens or 0, completion_tokens=usage.completion_tokens or 0)